@@ -0,0 +1,72 @@
+"""
+ARGUS inference benchmark: latency of each dynamic-resolution level.
+
+Run from the repo root (model paths are relative to it):
+    python backend/benchmark_inference.py --source assets/demo.jpg --runs 30
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+
+def load_frame(source, width=800):
+    """Load one frame (image or first video frame) and resize like main.py does"""
+    frame = cv2.imread(source)
+    if frame is None:
+        cap = cv2.VideoCapture(source)
+        ok, frame = cap.read()
+        cap.release()
+        if not ok:
+            raise SystemExit(f"[-] Could not read a frame from {source}")
+    h, w = frame.shape[:2]
+    if w > width:
+        frame = cv2.resize(frame, (width, int(h * width / w)))
+    return frame
+
+
+def time_model(model, frame, imgsz, runs, warmup=3):
+    for _ in range(warmup):
+        model(frame, imgsz=imgsz, verbose=False)
+    timings = []
+    detections = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        results = model(frame, imgsz=imgsz, verbose=False)
+        timings.append((time.perf_counter() - start) * 1000)
+        detections = sum(len(r.boxes) for r in results)
+    return np.median(timings), np.percentile(timings, 95), detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ARGUS dynamic inference resolution benchmark")
+    parser.add_argument("--source", default="assets/demo.jpg", help="Image or video file")
+    parser.add_argument("--models", nargs="+", default=["yolov8n.pt", "backend/Bike-Helmet-Detction-Model/Weights/best.pt"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[320, 480, 640])
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    print("--- ARGUS Inference Resolution Benchmark ---")
+    frame = load_frame(args.source)
+    print(f"Input frame: {frame.shape[1]}x{frame.shape[0]} ({args.runs} runs per level)")
+
+    for model_path in args.models:
+        try:
+            model = YOLO(model_path)
+        except Exception as e:
+            print(f"[-] Skipping {model_path}: {e}")
+            continue
+
+        print(f"\n{model_path}")
+        print(f"{'imgsz':>6} {'median ms':>10} {'p95 ms':>8} {'boxes':>6} {'saved vs max':>13}")
+        rows = [(size,) + time_model(model, frame, size, args.runs) for size in args.sizes]
+        baseline = max(rows, key=lambda r: r[0])[1]
+        for size, median, p95, boxes in rows:
+            saved = (1 - median / baseline) * 100 if baseline else 0
+            print(f"{size:>6} {median:>10.1f} {p95:>8.1f} {boxes:>6} {saved:>12.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+
+
+class FrameBufferPool:
+    """
+    Per-camera scratch arrays for the preprocessing hot path (resize, color convert,
+    DNN blob, face batch). Buffers are keyed by (name, shape, dtype) and reused across
+    frames; OpenCV writes into them through dst=, numpy through out=.
+
+    A buffer is only valid until the next call with the same name, so callers must not
+    keep references across frames.
+    """
+    def __init__(self):
+        self.buffers = {}
+        self.batch_capacities = {}
+        self.allocations = 0
+        self.reuses = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        key = (name, tuple(shape), np.dtype(dtype))
+        buf = self.buffers.get(key)
+        if buf is None:
+            # Shape changed (new resolution / more faces): drop the stale buffer for this name
+            for old in [k for k in self.buffers if k[0] == name]:
+                del self.buffers[old]
+            buf = np.empty(shape, dtype=dtype)
+            self.buffers[key] = buf
+            self.allocations += 1
+        else:
+            self.reuses += 1
+        return buf
+
+    def resize(self, src, size, name="resize", interpolation=cv2.INTER_LINEAR):
+        w, h = size
+        dst = self.get(name, (h, w) + src.shape[2:], src.dtype)
+        cv2.resize(src, size, dst=dst, interpolation=interpolation)
+        return dst
+
+    def cvt_color(self, src, code, name="color", channels=None):
+        shape = src.shape[:2] if channels == 1 else src.shape[:2] + ((channels or src.shape[2]),)
+        dst = self.get(name, shape, src.dtype)
+        cv2.cvtColor(src, code, dst=dst)
+        return dst
+
+    def blob(self, frame, size, mean, name="blob"):
+        """Same as cv2.dnn.blobFromImage(frame, 1.0, size, mean) (no swapRB/crop), into a reused NCHW buffer"""
+        resized = self.resize(frame, size, name=name + "_resize")
+        w, h = size
+        blob = self.get(name, (1, 3, h, w), np.float32)
+        for c in range(3):
+            np.subtract(resized[:, :, c], mean[c], out=blob[0, c], dtype=np.float32)
+        return blob
+
+    def face_batch(self, capacity, size=(224, 224), name="faces"):
+        """Float32 (N, H, W, 3) batch with N >= capacity; only grows (powers of two), slice [:count] to use"""
+        batch_capacity = self.batch_capacities.get(name, 1)
+        while batch_capacity < capacity:
+            batch_capacity *= 2
+        self.batch_capacities[name] = batch_capacity
+        w, h = size
+        return self.get(name, (batch_capacity, h, w, 3), np.float32)
+
+    def mobilenet_face(self, face_bgr, out, size=(224, 224), name="face"):
+        """
+        BGR face ROI -> MobileNetV2 input written into `out` (H, W, 3) float32.
+        Equivalent to cvtColor(BGR2RGB) + resize + img_to_array + preprocess_input
+        (x / 127.5 - 1); resizing first lets both steps use fixed-size buffers.
+        """
+        resized = self.resize(face_bgr, size, name=name + "_resize")
+        rgb = self.cvt_color(resized, cv2.COLOR_BGR2RGB, name=name + "_rgb")
+        np.multiply(rgb, 1.0 / 127.5, out=out, dtype=np.float32)
+        np.subtract(out, 1.0, out=out)
+        return out
+
+    def stats(self):
+        return {
+            "buffers": len(self.buffers),
+            "bytes": int(sum(b.nbytes for b in self.buffers.values())),
+            "allocations": self.allocations,
+            "reuses": self.reuses,
+        }
@@ -7,11 +7,12 @@ import os
 from ultralytics import YOLO
 from datetime import datetime
 from collections import deque
+from threat_scoring import ThreatScoringEngine
+from buffer_pool import FrameBufferPool
+from overlay import annotate_frame as draw_overlay
 
 # Import TensorFlow for Mask Detection
 try:
-    from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
-    from tensorflow.keras.preprocessing.image import img_to_array
     from tensorflow.keras.models import load_model
     TF_AVAILABLE = True
 except ImportError:
@@ -62,8 +63,12 @@ class TrackedObject:
         return ((x1 + x2) / 2, (y1 + y2) / 2)
 
 class ArgusDetector:
-    def __init__(self, model_path='yolov8n.pt'):
+    def __init__(self, model_path='yolov8n.pt', thread_budget=None, zones=None):
         self.logger = logging.getLogger("ArgusDetector")
+
+        # 0. Size torch / TF / OpenCV thread pools before any model initializes its runtime
+        if thread_budget:
+            thread_budget.apply_runtimes()
         
         # 1. Load YOLO (Standard)
         self.model = YOLO(model_path)
@@ -141,6 +146,23 @@ class ArgusDetector:
         # Proxies
         self.CLASS_PROXY_TOOL = 41   # 'cup' -> Simulates 'Tampering Tool'
         
+        # Temporal Scoring (sliding window + hysteresis, see threat_scoring.py)
+        # Exit thresholds sit below the enter thresholds; LOCK exit matches the old "score < 50" auto-unlock
+        self.scoring = ThreatScoringEngine(
+            window_seconds=2.0,
+            lock_enter=self.THREAT_THRESHOLD_LOCK, lock_exit=50,
+            warn_enter=self.THREAT_THRESHOLD_WARN, warn_exit=30,
+            enter_dwell=0.6, exit_dwell=1.5, min_hold=3.0,
+            categories=self.WEIGHTS
+        )
+
+        # Inference Zones (zones.ZoneMap): crop to ATM/entry zones, mask ignore regions.
+        # None = full frame, no zone filtering
+        self.zones = zones
+
+        # Preallocated scratch arrays (gray, blob, face batch) reused every frame
+        self.buffers = FrameBufferPool()
+
         # Tracking State
         self.tracked_objects = {}
         self.next_object_id = 0
@@ -150,16 +172,51 @@ class ArgusDetector:
         # Tamper Detection State
         self.prev_gray = None
         
+        # Optimization: Dynamic Inference Resolution (YOLO imgsz, multiples of 32)
+        # Ultralytics letterboxes to imgsz and scales boxes back to the input frame,
+        # so detections stay in frame coordinates whatever level is used.
+        self.IMGSZ_IDLE = 320     # Empty scene: cheap heartbeat check
+        self.IMGSZ_ACTIVE = 640   # Persons / threats present
+        self.IMGSZ_DETAIL = 640   # Small-object models (weapons) always run at full detail
+        self.scene_active = False
+        self.imgsz_counts = {} # imgsz -> main-model passes (reported on /inference/workers)
+
         # Optimization: Frame Skipping (Increased to 5 for smoother video)
         self.skip_interval = 5 
         self.last_raw_detections = []
         self.last_threat_score = 0
         self.last_decision = "NORMAL"
         self.last_reasons = []
+
+        # Laptop beeps on WARN/LOCK (off for offline/forensic runs)
+        self.audible_alarm = True
+
+    def reset_state(self, timestamp=None):
+        """Forget per-stream state (tracking, tamper baseline, temporal scoring) before a new video/chunk"""
+        self.tracked_objects = {}
+        self.next_object_id = 0
+        self.frame_count = 0
+        self.prev_gray = None
+        self.scene_active = False
+        self.last_raw_detections = []
+        self.last_threat_score = 0
+        self.last_decision = "NORMAL"
+        self.last_reasons = []
+        self.scoring.reset(timestamp)
         
-    def detect_objects(self, frame):
+    def select_imgsz(self):
+        """Pick the YOLO inference size from the current scene state"""
+        if self.scene_active or self.last_decision != "NORMAL":
+            return self.IMGSZ_ACTIVE
+        return self.IMGSZ_IDLE
+
+    def detect_objects(self, frame, imgsz=None, detail=True):
+        """detail=False skips the models that always run at IMGSZ_DETAIL (used for the idle-pass rerun)"""
+        imgsz = imgsz or self.IMGSZ_ACTIVE
+        self.imgsz_counts[imgsz] = self.imgsz_counts.get(imgsz, 0) + 1
+
         # 1. Main Object Detection (COCO)
-        results = self.model(frame, verbose=False)
+        results = self.model(frame, imgsz=imgsz, verbose=False)
         detections = []
         
         # Whitelist of COCO classes we care about
@@ -185,7 +242,7 @@ class ArgusDetector:
         
         # 2. Helmet Detection (Custom Model)
         if self.helmet_model_loaded:
-            helmet_results = self.helmet_model(frame, verbose=False)
+            helmet_results = self.helmet_model(frame, imgsz=imgsz, verbose=False)
             for r in helmet_results:
                 boxes = r.boxes
                 for box in boxes:
@@ -198,8 +255,8 @@ class ArgusDetector:
                             detections.append({'cls': 'HELMET_REAL', 'conf': conf, 'bbox': xyxy, 'source': 'helmet_model'})
 
         # 3. Gun Detection (Custom Model)
-        if self.gun_model_loaded:
-            gun_results = self.gun_model(frame, verbose=False)
+        if self.gun_model_loaded and detail:
+            gun_results = self.gun_model(frame, imgsz=self.IMGSZ_DETAIL, verbose=False)
             for r in gun_results:
                 boxes = r.boxes
                 for box in boxes:
@@ -212,7 +269,7 @@ class ArgusDetector:
 
         # 4. Cap Detection (Custom Model)
         if self.cap_model_loaded:
-            cap_results = self.cap_model(frame, verbose=False)
+            cap_results = self.cap_model(frame, imgsz=imgsz, verbose=False)
             for r in cap_results:
                 boxes = r.boxes
                 for box in boxes:
@@ -232,11 +289,11 @@ class ArgusDetector:
             return []
             
         (h, w) = frame.shape[:2]
-        blob = cv2.dnn.blobFromImage(frame, 1.0, (300, 300), (104.0, 177.0, 123.0))
+        blob = self.buffers.blob(frame, (300, 300), (104.0, 177.0, 123.0), name="face_blob")
         self.face_net.setInput(blob)
         detections = self.face_net.forward()
         
-        faces = []
+        face_rois = [] # Views into the frame, no copies
         locs = []
         preds = []
         results = []
@@ -259,18 +316,17 @@ class ArgusDetector:
                 face = frame[startY:endY, startX:endX]
                 if face.shape[0] < 10 or face.shape[1] < 10: continue # Skip small artifacts
                 
-                face = cv2.cvtColor(face, cv2.COLOR_BGR2RGB)
-                face = cv2.resize(face, (224, 224))
-                face = img_to_array(face)
-                face = preprocess_input(face)
-                
-                faces.append(face)
+                face_rois.append(face)
                 locs.append((startX, startY, endX, endY))
 
         # Batch prediction
-        if len(faces) > 0:
-            faces = np.array(faces, dtype="float32")
-            preds = self.mask_model.predict(faces, batch_size=32)
+        if len(locs) > 0:
+            # Face batch lives in a pooled (N, 224, 224, 3) float32 buffer:
+            # BGR->RGB, 224x224, img_to_array + preprocess_input, written in place
+            batch = self.buffers.face_batch(len(face_rois))
+            for i, face in enumerate(face_rois):
+                self.buffers.mobilenet_face(face, out=batch[i])
+            preds = self.mask_model.predict(batch[:len(locs)], batch_size=32)
         
         for (box, pred) in zip(locs, preds):
             (startX, startY, endX, endY) = box
@@ -287,6 +343,12 @@ class ArgusDetector:
             
         return results
 
+    def filter_zones(self, detections, zone_offset):
+        """Map crop-space boxes back to the full frame and keep only detections inside active zones"""
+        if zone_offset is None:
+            return detections
+        return self.zones.map_and_filter(detections, zone_offset, anchor_bottom_classes=(self.CLASS_PERSON,))
+
     def check_face_fallback(self, frame, person_box):
         """Fallback: Check top area of person box for mask/no-mask"""
         if not self.mask_model_loaded: return False
@@ -309,13 +371,10 @@ class ArgusDetector:
             face_crop = frame[startY:face_endY, startX:endX]
             if face_crop.shape[0] < 10 or face_crop.shape[1] < 10: return False
             
-            face_crop = cv2.cvtColor(face_crop, cv2.COLOR_BGR2RGB)
-            face_crop = cv2.resize(face_crop, (224, 224))
-            face_crop = img_to_array(face_crop)
-            face_crop = preprocess_input(face_crop)
-            face_crop = np.expand_dims(face_crop, axis=0)
+            face_batch = self.buffers.face_batch(1, name="fallback_face")
+            self.buffers.mobilenet_face(face_crop, out=face_batch[0])
             
-            (mask, withoutMask) = self.mask_model.predict(face_crop, verbose=0)[0]
+            (mask, withoutMask) = self.mask_model.predict(face_batch[:1], verbose=0)[0]
             label = "Mask" if mask > withoutMask else "No Mask"
             conf = max(mask, withoutMask)
             
@@ -333,7 +392,8 @@ class ArgusDetector:
     def check_tampering(self, frame, gray_frame):
         """Category 2: Check for camera blocking/tampering"""
         if self.prev_gray is None:
-            self.prev_gray = gray_frame
+            # gray_frame is a pooled buffer, overwritten next frame: keep our own copy
+            self.prev_gray = gray_frame.copy()
             return False, "Initializing"
             
         # 1. Global Intensity Change (Occlusion)
@@ -348,28 +408,44 @@ class ArgusDetector:
             
         return False, ""
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, annotate=True, timestamp=None):
         self.frame_count += 1
-        current_time = time.time()
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Recorded footage passes its own timeline; live frames use the wall clock
+        current_time = timestamp if timestamp is not None else time.time()
         
         if self.frame_count % self.skip_interval != 0 and self.frame_count > 1:
-            # SKIP FRAME: Use cached values
+            # SKIP FRAME: Use cached detections (decision still comes from the temporal engine below)
             raw_detections = self.last_raw_detections
-            threat_score = self.last_threat_score
-            decision = self.last_decision
             reasons = self.last_reasons
         else:
             # PROCESS FRAME
             
-            # 1. Standard Detections
-            raw_detections = self.detect_objects(frame)
+            # 0. Zones: run inference on the active-zone crop only (ignore regions blacked out)
+            if self.zones:
+                infer_frame, zone_offset = self.zones.prepare(frame, self.buffers)
+                gray_frame = self.buffers.cvt_color(self.zones.crop(frame), cv2.COLOR_BGR2GRAY, "gray", channels=1)
+            else:
+                infer_frame, zone_offset = frame, None
+                gray_frame = self.buffers.cvt_color(frame, cv2.COLOR_BGR2GRAY, "gray", channels=1)
+
+            # 1. Standard Detections (resolution follows scene state)
+            imgsz = self.select_imgsz()
+            raw_detections = self.filter_zones(self.detect_objects(infer_frame, imgsz), zone_offset)
+            if imgsz < self.IMGSZ_ACTIVE and raw_detections:
+                # Idle pass spotted something: redo the reduced-size models at full resolution,
+                # the gun model already ran at IMGSZ_DETAIL so its detections are kept
+                detail_detections = [d for d in raw_detections if d['source'] == 'gun_model']
+                raw_detections = self.filter_zones(self.detect_objects(infer_frame, self.IMGSZ_ACTIVE, detail=False), zone_offset)
+                raw_detections.extend(detail_detections)
+            # Detections are already filtered to relevant classes/models
+            self.scene_active = len(raw_detections) > 0
             
             # 2. Mask Detections
-            mask_detections = self.detect_masks(frame)
+            mask_detections = self.filter_zones(self.detect_masks(infer_frame), zone_offset)
             raw_detections.extend(mask_detections)
             
             threat_score = 0
+            contributions = {} # Category -> score added this frame (fed to the temporal engine)
             active_threats = [] # List of tuples (Category, Description, Weight)
             reasons = [] # User facing strings
             
@@ -379,6 +455,7 @@ class ArgusDetector:
             is_tampered, tamper_reason = self.check_tampering(frame, gray_frame)
             if is_tampered:
                 threat_score += self.WEIGHTS['TAMPER']
+                contributions['TAMPER'] = self.WEIGHTS['TAMPER']
                 active_threats.append(("TAMPER", tamper_reason, self.WEIGHTS['TAMPER']))
 
             # Object Level Analysis
@@ -437,21 +514,25 @@ class ArgusDetector:
             # CAT 1: WEAPON (High Severity)
             if weapons_found:
                 threat_score += self.WEIGHTS['WEAPON']
+                contributions['WEAPON'] = self.WEIGHTS['WEAPON']
                 active_threats.append(("WEAPON", f"Weapon(s): {', '.join(weapons_found)}", self.WEIGHTS['WEAPON']))
 
             # CAT 3: FACE CONCEALMENT (Mask)
             if mask_detected:
                  threat_score += self.WEIGHTS['FACE_MASK']
+                 contributions['FACE_MASK'] = self.WEIGHTS['FACE_MASK']
                  active_threats.append(("FACE", "Face Mask Detected", self.WEIGHTS['FACE_MASK']))
                     
             # CAT 3: HELMET (Real Model)
             if helmet_detected:
                 threat_score += self.WEIGHTS['HELMET']
+                contributions['HELMET'] = self.WEIGHTS['HELMET']
                 active_threats.append(("HELMET", "Rider Helmet Detected", self.WEIGHTS['HELMET']))
 
             # CAT 5: MULTI-PERSON (Crowd)
             if person_count > 1:
                 threat_score += self.WEIGHTS['CROWD']
+                contributions['CROWD'] = self.WEIGHTS['CROWD']
                 active_threats.append(("CROWD", f"Multiple People ({person_count})", self.WEIGHTS['CROWD']))
                 
                 # Simple Proximity Check
@@ -468,6 +549,7 @@ class ArgusDetector:
                         interArea = max(0, xB - xA) * max(0, yB - yA)
                         if interArea > 0: 
                             threat_score += 15 
+                            contributions['VIOLENCE'] = contributions.get('VIOLENCE', 0) + 15
                             # Stricter overlap for Violence (was 20000)
                             if interArea > 40000:
                                  active_threats.append(("VIOLENCE", "Subjects in Close Conflict", self.WEIGHTS['VIOLENCE']))
@@ -475,37 +557,28 @@ class ArgusDetector:
             # CAT 6: OBJECTS
             if suspicious_objects:
                 threat_score += self.WEIGHTS['OBJECT']
+                contributions['OBJECT'] = self.WEIGHTS['OBJECT']
                 active_threats.append(("OBJECT", f"Suspicious Item: {suspicious_objects[0]}", self.WEIGHTS['OBJECT']))
 
             # CAT 7: TIME
-            hour = datetime.now().hour
+            hour = datetime.fromtimestamp(current_time).hour
             if hour >= 23 or hour < 5:
                 threat_score += self.WEIGHTS['TIME']
+                contributions['TIME'] = self.WEIGHTS['TIME']
                 active_threats.append(("TIME", "Late Night Access", self.WEIGHTS['TIME']))
                 
                 # Late Night + Person = Suspicious
                 # SAFETY: If face is visible, do not apply this penalty
                 if person_count > 0 and not face_visible:
                     threat_score += 30
+                    contributions['BEHAVIOR'] = 30
                     active_threats.append(("BEHAVIOR", "Suspicious Late Activity", 30))
                 elif person_count > 0 and face_visible:
                      active_threats.append(("SAFETY", "Identity Verification: OK", -10))
                 
-            # Final Score Cap
+            # Final Score Cap (instantaneous, single-frame score)
             threat_score = min(threat_score, 100)
-            
-            # --- DECISION LOGIC ---
-            decision = "NORMAL"
-            if threat_score >= self.THREAT_THRESHOLD_LOCK:
-                decision = "LOCK"
-                # Laptop Siren (High Pitch, Long)
-                try: winsound.Beep(2500, 500) 
-                except: pass
-            elif threat_score >= self.THREAT_THRESHOLD_WARN:
-                decision = "WARN"
-                # Laptop Warning (Lower Pitch, Short)
-                try: winsound.Beep(1000, 200)
-                except: pass
+            self.scoring.update(contributions, current_time)
                 
             # Format reasons for UI
             reasons = [t[1] for t in active_threats]
@@ -513,71 +586,38 @@ class ArgusDetector:
             # Cache results
             self.last_raw_detections = raw_detections
             self.last_threat_score = threat_score
-            self.last_decision = decision
             self.last_reasons = reasons
+
+        # --- DECISION LOGIC ---
+        # Smoothed score over the sliding window with enter/exit thresholds + dwell times,
+        # evaluated on every frame so dwell/hold timers advance on skipped frames too
+        threat_score, decision = self.scoring.decide(current_time)
+        if decision != "NORMAL" and not reasons:
+            reasons = [f"Holding {decision} (threat decaying)"]
+        self.last_decision = decision
         
-        # --- ANNOTATION ---
-        for d in raw_detections:
-            x1, y1, x2, y2 = map(int, d['bbox'])
-            cls = d['cls']
-            conf = d['conf']
-            source = d['source']
-            
-            color = (0, 255, 0) # Green normal
-            label_text = ""
-            
-            # Filter Visualization: Only draw Threats or Persons
-            should_draw = False
-            color = (0, 255, 0) # Default Green
-            label_text = ""
-            
-            if source == 'coco':
-                # Only draw Person, Weapons, Bags
-                if cls in [self.CLASS_PERSON, self.CLASS_BACKPACK, self.CLASS_HANDBAG, self.CLASS_SUITCASE]:
-                    should_draw = True
-                    label_text = f"{self.model.names[cls]} {conf:.2f}"
-                elif cls in [self.CLASS_KNIFE, self.CLASS_SCISSORS]:
-                    should_draw = True
-                    label_text = f"{self.model.names[cls]} {conf:.2f}"
-                    color = (0, 0, 255) # Red for weapon
-
-            elif source in ['helmet_model', 'mask_model', 'gun_model', 'cap_model']:
-                should_draw = True # Always draw custom model detections
-                if source == 'helmet_model':
-                    label_text = f"HELMET {conf:.2f}"
-                    if cls == 'HELMET_REAL': color = (0, 0, 255)
-                elif source == 'mask_model':
-                    label_text = f"MASK {conf:.2f}"
-                    color = (0, 0, 255)
-                elif source == 'gun_model':
-                    label_text = f"GUN {conf:.2f}"
-                    color = (0, 0, 255)
-                elif source == 'cap_model':
-                    label_text = f"CAP {conf:.2f}"
-                    color = (0, 165, 255)
-
-            if should_draw:
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                cv2.putText(frame, label_text, (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-            
-        # Overlay Status
-        status_color = (0, 255, 0)
-        if decision == "WARN": 
-            status_color = (0, 255, 255) # Yellow
+        # Laptop Alarm
+        if decision == "WARN" and self.audible_alarm: 
             try: winsound.Beep(1000, 200) # Short warning beep
             except: pass
-        if decision == "LOCK": 
-            status_color = (0, 0, 255) # Red
+        if decision == "LOCK" and self.audible_alarm: 
             try: winsound.Beep(2500, 500) # Long alarm beep
             except: pass
-        
-        cv2.putText(frame, f"STATUS: {decision} ({threat_score}%)", (20, 40), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, status_color, 2)
-        
-        y_offset = 80
-        for reason in reasons:
-            cv2.putText(frame, f"- {reason}", (20, y_offset), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-            y_offset += 25
+
+        # --- ANNOTATION ---
+        # Callers that may reuse the previous encoded frame (static scene) annotate later themselves
+        if annotate:
+            self.annotate_frame(frame, raw_detections, threat_score, decision, reasons)
 
         return frame, threat_score, decision, reasons
+
+    @property
+    def overlay_classes(self):
+        """(class_names, object_classes, weapon_classes) for overlay.annotate_frame"""
+        return (dict(self.model.names),
+                [self.CLASS_PERSON, self.CLASS_BACKPACK, self.CLASS_HANDBAG, self.CLASS_SUITCASE],
+                [self.CLASS_KNIFE, self.CLASS_SCISSORS])
+
+    def annotate_frame(self, frame, raw_detections, threat_score, decision, reasons):
+        """Draw detection boxes + status overlay in place"""
+        return draw_overlay(frame, raw_detections, threat_score, decision, reasons, *self.overlay_classes)
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    camera_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    decision TEXT,
+    previous_decision TEXT,
+    threat_score INTEGER,
+    reasons TEXT,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events (camera_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_kind_ts ON events (kind, ts);
+"""
+
+INSERT_SQL = """
+INSERT INTO events (ts, camera_id, kind, decision, previous_decision, threat_score, reasons, detail)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class EventStore:
+    """
+    Local SQLite (WAL) history of decision transitions, hardware/serial and control events.
+
+    Writers only enqueue a tuple; a background thread commits rows in batches so the
+    video loop never touches the disk. Reads use their own per-thread connections.
+    """
+    def __init__(self, db_path="argus_events.db", batch_size=200, flush_interval=1.0):
+        self.logger = logging.getLogger("EventStore")
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.pending = queue.Queue()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.local = threading.local()
+        self.last_decisions = {}
+        self.rows_written = 0
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self.local.conn = conn
+        return conn
+
+    # --- WRITE SIDE ---
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._writer_loop, name="EventStoreWriter", daemon=True)
+        self.thread.start()
+        self.logger.info(f"Event store writing to {self.db_path}")
+
+    def stop(self, timeout=None):
+        if not self.thread:
+            return
+        self.stop_event.set()
+        self.thread.join(timeout)
+        self.thread = None
+
+    def record(self, kind, camera_id, decision=None, previous_decision=None, score=None, reasons=None, detail=None, timestamp=None):
+        """Queue one event (non-blocking)"""
+        self.pending.put((
+            timestamp or time.time(),
+            camera_id,
+            kind,
+            decision,
+            previous_decision,
+            None if score is None else int(score),
+            json.dumps(list(reasons)) if reasons else None,
+            json.dumps(detail, default=str) if detail is not None else None,
+        ))
+
+    def record_decision(self, camera_id, decision, score, reasons, timestamp=None):
+        """Record only when the decision for this camera changes"""
+        previous = self.last_decisions.get(camera_id)
+        if decision == previous:
+            return False
+        self.last_decisions[camera_id] = decision
+        self.record("decision", camera_id, decision=decision, previous_decision=previous,
+                    score=score, reasons=reasons, timestamp=timestamp)
+        return True
+
+    def _writer_loop(self):
+        conn = self._connect()
+        try:
+            while not self.stop_event.is_set() or not self.pending.empty():
+                batch = []
+                try:
+                    batch.append(self.pending.get(timeout=self.flush_interval))
+                except queue.Empty:
+                    continue
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.pending.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    with conn:
+                        conn.executemany(INSERT_SQL, batch)
+                    self.rows_written += len(batch)
+                except Exception as e:
+                    self.logger.error(f"Failed to write {len(batch)} events: {e}")
+        finally:
+            conn.close()
+
+    # --- READ SIDE ---
+
+    def timeline(self, camera_id=None, start=None, end=None, kind=None, limit=500):
+        """Events in [start, end], newest first"""
+        clauses, params = [], []
+        if camera_id:
+            clauses.append("camera_id = ?")
+            params.append(camera_id)
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(end)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT * FROM events {where} ORDER BY ts DESC LIMIT ?", params + [int(limit)]
+        ).fetchall()
+
+        events = []
+        for row in rows:
+            event = dict(row)
+            event["reasons"] = json.loads(event["reasons"]) if event["reasons"] else []
+            event["detail"] = json.loads(event["detail"]) if event["detail"] else None
+            events.append(event)
+        return events
+
+    def aggregates(self, camera_id=None, start=None, end=None, bucket_seconds=3600):
+        """Decision transition counts and peak score per time bucket"""
+        end = end if end is not None else time.time()
+        start = start if start is not None else end - 24 * 3600
+        bucket_seconds = max(1, int(bucket_seconds))
+
+        clauses, params = ["kind = 'decision'", "ts >= ?", "ts <= ?"], [start, end]
+        if camera_id:
+            clauses.append("camera_id = ?")
+            params.append(camera_id)
+        rows = self._reader().execute(
+            f"""
+            SELECT CAST(ts / ? AS INTEGER) * ? AS bucket, camera_id, decision,
+                   COUNT(*) AS count, MAX(threat_score) AS max_score
+            FROM events WHERE {' AND '.join(clauses)}
+            GROUP BY bucket, camera_id, decision
+            ORDER BY bucket
+            """,
+            [bucket_seconds, bucket_seconds] + params,
+        ).fetchall()
+
+        buckets = {}
+        for row in rows:
+            key = (row["bucket"], row["camera_id"])
+            entry = buckets.setdefault(key, {
+                "bucket_start": row["bucket"],
+                "camera_id": row["camera_id"],
+                "counts": {},
+                "max_score": 0,
+            })
+            entry["counts"][row["decision"]] = row["count"]
+            entry["max_score"] = max(entry["max_score"], row["max_score"] or 0)
+        return {
+            "start": start,
+            "end": end,
+            "bucket_seconds": bucket_seconds,
+            "buckets": list(buckets.values()),
+        }
@@ -0,0 +1,295 @@
+"""
+ARGUS Fleet Aggregator: one control-room view over many ARGUS backends.
+
+Subscribes to every site's /ws/status, keeps a merged in-memory view (indexed by
+decision) and serves it through one multiplexed WebSocket with filtering.
+
+    python backend/fleet_aggregator.py --site atm-01=ws://10.0.0.5:8000 --site atm-02=ws://10.0.0.6:8000
+    python backend/fleet_aggregator.py --sites-file sites.json --port 9000
+
+Dashboards connect to ws://host:9000/ws/fleet?decision=WARN,LOCK and receive a
+snapshot followed by batched updates. Filters can be changed at runtime by sending
+{"filter": {"decision": ["LOCK"], "site": ["atm-01"]}}.
+"""
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+
+import websockets
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
+from fastapi.middleware.cors import CORSMiddleware
+
+logger = logging.getLogger("ARGUS_Fleet")
+
+# Fields that make an update worth pushing (status arrives every 0.5s per site)
+TRACKED_FIELDS = ("status", "threat_score", "lock_status", "siren", "hardware", "reasons", "connected")
+
+
+class FleetSubscriber:
+    """One dashboard connection: its filter plus coalesced pending updates (bounded by site count)"""
+    def __init__(self, decisions=None, sites=None):
+        self.decisions = set(decisions or [])
+        self.sites = set(sites or [])
+        self.visible = set()
+        self.pending = {}
+        self.removed = set()
+        self.wakeup = asyncio.Event()
+
+    def matches(self, record):
+        if self.decisions and record["status"] not in self.decisions:
+            return False
+        if self.sites and record["site"] not in self.sites:
+            return False
+        return True
+
+    def offer(self, record):
+        site = record["site"]
+        if self.matches(record):
+            self.visible.add(site)
+            self.removed.discard(site)
+            self.pending[site] = record
+        elif site in self.visible:
+            # Site left this viewer's filter (e.g. LOCK -> NORMAL with a WARN/LOCK filter)
+            self.visible.discard(site)
+            self.pending.pop(site, None)
+            self.removed.add(site)
+        else:
+            return
+        self.wakeup.set()
+
+    def take(self):
+        updates, removed = list(self.pending.values()), sorted(self.removed)
+        self.pending, self.removed = {}, set()
+        self.wakeup.clear()
+        return updates, removed
+
+
+class FleetState:
+    """Merged per-site view with a decision index; pushes changes to subscribers"""
+    def __init__(self):
+        self.sites = {}
+        self.by_decision = {}
+        self.subscribers = set()
+
+    def register(self, site, url):
+        record = {
+            "site": site, "url": url, "connected": False, "status": "UNKNOWN",
+            "threat_score": 0, "lock_status": "UNKNOWN", "siren": False, "hardware": False,
+            "reasons": [], "last_update": 0, "last_seen": 0,
+        }
+        self.sites[site] = record
+        self.by_decision.setdefault("UNKNOWN", set()).add(site)
+
+    def update(self, site, **fields):
+        record = self.sites[site]
+        changed = any(k in TRACKED_FIELDS and record.get(k) != v for k, v in fields.items())
+        old_status = record["status"]
+        record.update(fields)
+        record["last_seen"] = time.time()
+
+        if record["status"] != old_status:
+            self.by_decision.get(old_status, set()).discard(site)
+            self.by_decision.setdefault(record["status"], set()).add(site)
+        if changed:
+            snapshot = dict(record)
+            for subscriber in self.subscribers:
+                subscriber.offer(snapshot)
+
+    def query(self, decisions=None, sites=None):
+        if decisions:
+            names = set().union(*(self.by_decision.get(d, set()) for d in decisions))
+        else:
+            names = set(self.sites)
+        if sites:
+            names &= set(sites)
+        return [dict(self.sites[name]) for name in sorted(names)]
+
+    def summary(self):
+        return {
+            "sites": len(self.sites),
+            "connected": sum(1 for r in self.sites.values() if r["connected"]),
+            "by_decision": {d: len(s) for d, s in self.by_decision.items() if s},
+        }
+
+
+async def follow_site(state, site, url, base_delay=1.0, max_delay=30.0):
+    """Keep one backend's /ws/status subscribed, reconnecting with exponential backoff + jitter"""
+    attempt = 0
+    while True:
+        try:
+            async with websockets.connect(url, open_timeout=5, ping_interval=10) as ws:
+                logger.info(f"[{site}] Connected to {url}")
+                attempt = 0
+                async for message in ws:
+                    data = json.loads(message)
+                    state.update(site, connected=True, **{k: data[k] for k in data if k != "site"})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[{site}] Status stream lost: {e}")
+
+        state.update(site, connected=False)
+        delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+def normalize_url(url):
+    url = url.rstrip("/")
+    if url.startswith("http"):
+        url = "ws" + url[4:]
+    return url if url.endswith("/ws/status") else url + "/ws/status"
+
+
+def parse_list(value):
+    return [v.strip() for v in value.split(",") if v.strip()] if value else []
+
+
+def parse_filter_message(text):
+    """
+    Client message -> (decisions, sites), or None for messages without a filter.
+    Raises ValueError with a client-facing reason for malformed messages.
+    """
+    try:
+        message = json.loads(text)
+    except ValueError:
+        raise ValueError("Message is not valid JSON")
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    new_filter = message.get("filter")
+    if new_filter is None:
+        return None
+    if not isinstance(new_filter, dict):
+        raise ValueError("'filter' must be an object")
+
+    parsed = []
+    for key in ("decision", "site"):
+        value = new_filter.get(key)
+        if isinstance(value, str):
+            value = parse_list(value)
+        elif value is None:
+            value = []
+        elif not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            raise ValueError(f"'filter.{key}' must be a list of strings or a comma-separated string")
+        parsed.append(set(value))
+    return tuple(parsed)
+
+
+def create_app(site_urls):
+    state = FleetState()
+    for site, url in site_urls.items():
+        state.register(site, normalize_url(url))
+
+    app = FastAPI(title="ARGUS Fleet Aggregator")
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.state.fleet = state
+    tasks = []
+
+    @app.on_event("startup")
+    async def startup_event():
+        for site, record in state.sites.items():
+            tasks.append(asyncio.create_task(follow_site(state, site, record["url"])))
+        logger.info(f"Following {len(tasks)} site(s)")
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        for task in tasks:
+            task.cancel()
+
+    @app.get("/sites")
+    async def get_sites(decision: str = Query(None), site: str = Query(None)):
+        return {"summary": state.summary(), "sites": state.query(parse_list(decision), parse_list(site))}
+
+    @app.websocket("/ws/fleet")
+    async def fleet_endpoint(websocket: WebSocket, decision: str = None, site: str = None):
+        await websocket.accept()
+        subscriber = FleetSubscriber(parse_list(decision), parse_list(site))
+        state.subscribers.add(subscriber)
+
+        async def send_snapshot():
+            records = [r for r in state.query() if subscriber.matches(r)]
+            subscriber.visible = {r["site"] for r in records}
+            subscriber.take()
+            await websocket.send_json({"type": "snapshot", "summary": state.summary(), "sites": records})
+
+        async def receive_filters():
+            while True:
+                text = await websocket.receive_text()
+                try:
+                    new_filter = parse_filter_message(text)
+                except ValueError as e:
+                    # Bad message: tell the client, keep the connection and the current filter
+                    await websocket.send_json({"type": "error", "error": str(e)})
+                    continue
+                if new_filter is not None:
+                    subscriber.decisions, subscriber.sites = new_filter
+                    await send_snapshot()
+
+        receiver = asyncio.create_task(receive_filters())
+        waiter = None
+        try:
+            await send_snapshot()
+            while True:
+                waiter = asyncio.create_task(subscriber.wakeup.wait())
+                done, _ = await asyncio.wait({waiter, receiver}, timeout=5, return_when=asyncio.FIRST_COMPLETED)
+                if receiver in done:
+                    # Client went away (or the receiver failed): stop before sending on a closed socket
+                    receiver.result()
+                    break
+                if waiter not in done:
+                    waiter.cancel()
+                    # Keepalive so proxies don't drop idle control-room screens
+                    await websocket.send_json({"type": "heartbeat", "summary": state.summary()})
+                    continue
+                updates, removed = subscriber.take()
+                if updates or removed:
+                    await websocket.send_json({"type": "update", "sites": updates, "removed": removed})
+        except WebSocketDisconnect:
+            logger.info("Fleet client disconnected")
+        except Exception as e:
+            logger.error(f"Fleet client error: {e}")
+        finally:
+            if waiter:
+                waiter.cancel()
+            receiver.cancel()
+            state.subscribers.discard(subscriber)
+
+    return app
+
+
+def load_sites(args):
+    sites = {}
+    if args.sites_file:
+        with open(args.sites_file) as f:
+            sites.update(json.load(f).get("sites", {}))
+    for entry in args.site or []:
+        name, _, url = entry.partition("=")
+        if not url:
+            raise SystemExit(f"[-] Bad --site '{entry}', expected name=ws://host:port")
+        sites[name] = url
+    if not sites:
+        raise SystemExit("[-] No sites configured (use --site or --sites-file)")
+    return sites
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="ARGUS multi-site fleet aggregator")
+    parser.add_argument("--site", action="append", help="name=ws://host:port (repeatable)")
+    parser.add_argument("--sites-file", help='JSON file: {"sites": {"atm-01": "ws://host:8000"}}')
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(create_app(load_sites(args)), host=args.host, port=args.port)
@@ -0,0 +1,248 @@
+"""
+ARGUS forensic mode: run the detector over recorded DVR footage in parallel and produce a
+merged, time-indexed report of WARN/LOCK intervals with reasons and thumbnails.
+
+Each video is split into time chunks that are processed across a process pool. Every
+chunk starts decoding --warmup seconds early (results discarded) so tracking, tamper
+baseline and the temporal scoring engine are in a realistic state at the boundary.
+
+The wall-clock time of each file's first frame is given as path@ISO-time; files without
+one fall back to their mtime minus duration. Run from the repo root (model paths are
+relative to it):
+    python backend/forensic_analysis.py footage/atm_0412_a.mp4@2026-04-12T22:00:00 \
+        footage/atm_0412_b.mp4@2026-04-13T00:00:00 --workers 4
+"""
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from buffer_pool import FrameBufferPool
+from thread_budget import ThreadBudget
+from zones import load_zone_config, zones_file_from_env
+
+_detector = None
+_buffers = None
+
+
+def _init_worker(model_path, budget_spec, zones_file, camera_id):
+    """Process-pool initializer: load the models once per worker process"""
+    global _detector, _buffers
+    budget = ThreadBudget.from_string(budget_spec)
+    budget.configure_environment()
+    from detection import ArgusDetector
+
+    _detector = ArgusDetector(model_path=model_path, thread_budget=budget,
+                              zones=load_zone_config(zones_file).get(camera_id) if zones_file else None)
+    _detector.audible_alarm = False
+    _detector.skip_interval = 1 # Every sampled frame is a full inference frame
+    _buffers = FrameBufferPool()
+
+
+def probe_video(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        # Plain exception: raised inside pool workers, where SystemExit would break the pool
+        raise IOError(f"Cannot open {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, frames
+
+
+def parse_video_arg(arg):
+    """'path' or 'path@ISO-time' -> (path, start timestamp or None)"""
+    path, sep, when = arg.rpartition("@")
+    if sep and not os.path.exists(arg):
+        try:
+            return path, datetime.fromisoformat(when).timestamp()
+        except ValueError:
+            pass
+    return arg, None
+
+
+def analyze_chunk(job):
+    """Worker: decode [start - warmup, end) at the analysis rate and record decisions for [start, end)"""
+    path, video_start, chunk_start, chunk_end, warmup, analysis_fps, thumbs_dir = job
+    fps, _ = probe_video(path)
+    step = max(1, int(round(fps / analysis_fps)))
+    first_frame = int(max(0.0, chunk_start - warmup) * fps)
+    last_frame = int(chunk_end * fps)
+
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+    _detector.reset_state(video_start + first_frame / fps)
+
+    samples, thumbnails = [], []
+    previous = "NORMAL"
+    frame_index = first_frame
+    while frame_index < last_frame:
+        # Frames between samples are only grabbed (no decode)
+        if (frame_index - first_frame) % step != 0:
+            if not cap.grab():
+                break
+            frame_index += 1
+            continue
+        ok, frame = cap.read()
+        if not ok:
+            break
+        offset = frame_index / fps
+        frame_index += 1
+
+        h, w = frame.shape[:2]
+        if w > 800:
+            frame = _buffers.resize(frame, (800, int(h * 800 / w)))
+        _, score, decision, reasons = _detector.process_frame(frame, annotate=False, timestamp=video_start + offset)
+        if offset < chunk_start:
+            previous = decision
+            continue # Warm-up only
+
+        samples.append((round(offset, 3), decision, score, reasons))
+        if decision != "NORMAL" and decision != previous:
+            # Annotated thumbnail on every escalation
+            _detector.annotate_frame(frame, _detector.last_raw_detections, score, decision, reasons)
+            name = f"{os.path.splitext(os.path.basename(path))[0]}_{offset:09.2f}_{decision}.jpg"
+            thumb_path = os.path.join(thumbs_dir, name)
+            cv2.imwrite(thumb_path, frame, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
+            thumbnails.append((round(offset, 3), thumb_path))
+        previous = decision
+
+    cap.release()
+    return {"path": path, "start": chunk_start, "end": chunk_end, "samples": samples, "thumbnails": thumbnails}
+
+
+def build_intervals(samples, thumbnails, video_start, max_gap):
+    """Merge consecutive WARN/LOCK samples (across chunk boundaries) into incident intervals"""
+    intervals = []
+    current = None
+    for offset, decision, score, reasons in samples:
+        if decision == "NORMAL":
+            current = None
+            continue
+        if current and offset - current["end_offset"] <= max_gap:
+            current["end_offset"] = offset
+        else:
+            current = {"start_offset": offset, "end_offset": offset, "decision": decision, "max_score": 0, "reasons": {}}
+            intervals.append(current)
+        if decision == "LOCK":
+            current["decision"] = "LOCK"
+        current["max_score"] = max(current["max_score"], score)
+        for reason in reasons:
+            current["reasons"][reason] = current["reasons"].get(reason, 0) + 1
+
+    for interval in intervals:
+        interval["start_time"] = datetime.fromtimestamp(video_start + interval["start_offset"]).isoformat()
+        interval["end_time"] = datetime.fromtimestamp(video_start + interval["end_offset"]).isoformat()
+        interval["duration"] = round(interval["end_offset"] - interval["start_offset"], 2)
+        interval["reasons"] = sorted(interval["reasons"], key=interval["reasons"].get, reverse=True)
+        interval["thumbnails"] = [p for t, p in thumbnails
+                                  if interval["start_offset"] <= t <= interval["end_offset"]]
+    return intervals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ARGUS bulk forensic analysis of recorded footage")
+    parser.add_argument("videos", nargs="+", help="Video files, optionally as path@ISO-time of the first frame")
+    parser.add_argument("--output", default="forensic_report")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--chunk-seconds", type=float, default=120.0)
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds decoded before each chunk to warm up state")
+    parser.add_argument("--analysis-fps", type=float, default=5.0, help="Frames analysed per second of footage")
+    parser.add_argument("--start-time", help="Wall-clock time of the first frame (ISO), single video only; "
+                                             "default: file mtime - duration")
+    parser.add_argument("--camera-id", default="cam0", help="Camera whose zones apply")
+    parser.add_argument("--zones-file", default=None, help="Default: $ARGUS_ZONES_FILE or backend/zones.json")
+    parser.add_argument("--model", default="yolov8n.pt")
+    args = parser.parse_args()
+    if args.zones_file is None:
+        args.zones_file = zones_file_from_env()
+    elif not os.path.exists(args.zones_file):
+        parser.error(f"--zones-file {args.zones_file} does not exist")
+    if args.start_time and len(args.videos) > 1:
+        parser.error("--start-time applies to a single video; use path@ISO-time per file")
+
+    print("--- ARGUS Forensic Analysis ---")
+    thumbs_dir = os.path.join(args.output, "thumbnails")
+    os.makedirs(thumbs_dir, exist_ok=True)
+
+    # Split the cores between workers so their thread pools don't oversubscribe
+    cores = os.cpu_count() or 1
+    per_worker = max(1, cores // args.workers)
+    budget = ThreadBudget(torch_intra=per_worker, tf_intra=per_worker, opencv=1, reserved_cores=0).to_string()
+
+    jobs, videos = [], {}
+    for arg in args.videos:
+        path, video_start = parse_video_arg(arg)
+        try:
+            fps, frame_count = probe_video(path)
+        except IOError as e:
+            print(f"[-] Skipping: {e}")
+            continue
+        duration = frame_count / fps
+        if video_start is None and args.start_time:
+            video_start = datetime.fromisoformat(args.start_time).timestamp()
+        elif video_start is None:
+            video_start = os.path.getmtime(path) - duration
+            print(f"[!] {path}: no start time given, using mtime - duration")
+        videos[path] = {"fps": fps, "duration": duration, "start": video_start, "failed_chunks": []}
+        chunk_start = 0.0
+        while chunk_start < duration:
+            chunk_end = min(duration, chunk_start + args.chunk_seconds)
+            jobs.append((path, video_start, chunk_start, chunk_end, args.warmup, args.analysis_fps, thumbs_dir))
+            chunk_start = chunk_end
+    total_media = sum(v["duration"] for v in videos.values())
+    print(f"{len(videos)} video(s), {total_media / 60:.1f} min of footage, {len(jobs)} chunk(s), {args.workers} worker(s)")
+
+    started = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.model, budget, args.zones_file, args.camera_id)) as pool:
+        futures = {pool.submit(analyze_chunk, job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            path, _, chunk_start, chunk_end = futures[future][:4]
+            try:
+                result = future.result()
+            except Exception as e:
+                # One unreadable chunk must not drop the rest of the report
+                videos[path]["failed_chunks"].append({"start": chunk_start, "end": chunk_end, "error": str(e)})
+                print(f"    [{done}/{len(jobs)}] {os.path.basename(path)} {chunk_start:.0f}-{chunk_end:.0f}s: FAILED ({e})")
+                continue
+            results.append(result)
+            print(f"    [{done}/{len(jobs)}] {os.path.basename(result['path'])} "
+                  f"{result['start']:.0f}-{result['end']:.0f}s: {len(result['samples'])} samples")
+    elapsed = time.time() - started
+
+    report = {"generated": datetime.now().isoformat(), "elapsed_seconds": round(elapsed, 1),
+              "speedup_vs_realtime": round(total_media / elapsed, 1) if elapsed else None, "videos": []}
+    max_gap = 2.0 / args.analysis_fps
+    for path, info in videos.items():
+        chunks = sorted((r for r in results if r["path"] == path), key=lambda r: r["start"])
+        samples = [s for r in chunks for s in r["samples"]]
+        thumbnails = [t for r in chunks for t in r["thumbnails"]]
+        intervals = build_intervals(samples, thumbnails, info["start"], max_gap)
+        report["videos"].append({
+            "path": path,
+            "start_time": datetime.fromtimestamp(info["start"]).isoformat(),
+            "duration": round(info["duration"], 1),
+            "intervals": intervals,
+            "failed_chunks": sorted(info["failed_chunks"], key=lambda c: c["start"]),
+        })
+        print(f"\n{path}: {len(intervals)} WARN/LOCK interval(s)"
+              + (f", {len(info['failed_chunks'])} failed chunk(s)" if info["failed_chunks"] else ""))
+        for interval in intervals:
+            print(f"    {interval['start_time']} -> {interval['end_time']}  {interval['decision']:<4} "
+                  f"max {interval['max_score']:3d}%  {'; '.join(interval['reasons'][:3])}")
+
+    report_path = os.path.join(args.output, "report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[SUCCESS] {total_media / 60:.1f} min analysed in {elapsed / 60:.1f} min "
+          f"({report['speedup_vs_realtime']}x real time). Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import time
+import asyncio
+from contextlib import contextmanager
+
+
+class FrameCache:
+    """
+    Latest encoded (JPEG) frame, shared by every viewer: /ws/video, /stream.mjpg, /snapshot.jpg.
+
+    The video pipeline publishes each frame once; viewers only wait for the next sequence
+    number and send the same bytes, so extra viewers add no detection or encoding work.
+    Must be used from the event loop thread.
+    """
+    def __init__(self):
+        self.jpeg = None
+        self.seq = 0
+        self.timestamp = 0.0
+        self.boot_id = format(int(time.time()), "x")
+        self.condition = asyncio.Condition()
+
+        self.viewers = 0
+        self.published = 0
+        self.unchanged = 0
+        self.sends_saved = 0
+
+    @property
+    def etag(self):
+        return f'"{self.boot_id}-{self.seq}"'
+
+    @property
+    def age(self):
+        return time.time() - self.timestamp if self.jpeg is not None else None
+
+    async def publish(self, jpeg_bytes, timestamp=None):
+        async with self.condition:
+            self.jpeg = jpeg_bytes
+            self.timestamp = timestamp or time.time()
+            self.seq += 1
+            self.published += 1
+            self.condition.notify_all()
+
+    def mark_unchanged(self):
+        """The pipeline produced the same bytes again: keep seq/ETag so viewers send nothing"""
+        self.unchanged += 1
+        self.sends_saved += self.viewers
+
+    @contextmanager
+    def watching(self):
+        """Count a streaming viewer (/ws/video, /stream.mjpg) for the saved-sends stats"""
+        self.viewers += 1
+        try:
+            yield
+        finally:
+            self.viewers -= 1
+
+    def stats(self):
+        total = self.published + self.unchanged
+        return {
+            "published": self.published,
+            "unchanged": self.unchanged,
+            "viewers": self.viewers,
+            "sends_saved": self.sends_saved,
+            "publish_saved_ratio": round(self.unchanged / total, 3) if total else 0.0,
+        }
+
+    async def wait_for_next(self, last_seq=0, timeout=None):
+        """Return (seq, jpeg) newer than last_seq; skips intermediate frames for slow viewers"""
+        async with self.condition:
+            if self.seq <= last_seq or self.jpeg is None:
+                await asyncio.wait_for(
+                    self.condition.wait_for(lambda: self.seq > last_seq and self.jpeg is not None),
+                    timeout,
+                )
+            return self.seq, self.jpeg
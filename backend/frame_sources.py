@@ -0,0 +1,135 @@
+import time
+import threading
+import logging
+
+import cv2
+import numpy as np
+
+# Frame Timestamp Stamp: 32 black/white blocks along the bottom-left edge carrying the
+# capture time in ms (mod 2^32). Blocks are 8px-aligned so they survive JPEG at q70.
+STAMP_BITS = 32
+STAMP_BLOCK = 16
+
+
+def stamp_timestamp(frame, timestamp):
+    h = frame.shape[0]
+    value = int(timestamp * 1000) & 0xFFFFFFFF
+    y1 = h - STAMP_BLOCK
+    for bit in range(STAMP_BITS):
+        x1 = bit * STAMP_BLOCK
+        frame[y1:h, x1:x1 + STAMP_BLOCK] = 255 if (value >> bit) & 1 else 0
+    return frame
+
+
+def read_timestamp(frame, now=None):
+    """Decode a stamped capture time (seconds). Returns None if the frame is too small."""
+    h, w = frame.shape[:2]
+    if w < STAMP_BITS * STAMP_BLOCK or h < STAMP_BLOCK:
+        return None
+    y = h - STAMP_BLOCK // 2
+    value = 0
+    for bit in range(STAMP_BITS):
+        x = bit * STAMP_BLOCK + STAMP_BLOCK // 2
+        if frame[y - 2:y + 3, x - 2:x + 3].mean() > 127:
+            value |= 1 << bit
+
+    # Restore the high bits from the current clock
+    now_ms = int((now or time.time()) * 1000)
+    full = (now_ms & ~0xFFFFFFFF) | value
+    if full > now_ms + 0x7FFFFFFF:
+        full -= 1 << 32
+    return full / 1000.0
+
+
+class _PacedSource:
+    """Blocks read() until the next frame slot, like a real camera does"""
+    def __init__(self, fps):
+        self.fps = fps
+        self.next_frame_at = 0.0
+        self.lock = threading.Lock()
+
+    def _wait_for_slot(self):
+        with self.lock:
+            now = time.time()
+            if self.next_frame_at > now:
+                time.sleep(self.next_frame_at - now)
+                now = self.next_frame_at
+            self.next_frame_at = max(self.next_frame_at, now) + 1.0 / self.fps
+
+
+class SyntheticCapture(_PacedSource):
+    """cv2.VideoCapture stand-in: moving shapes at a fixed FPS, stamped with capture time"""
+    def __init__(self, width=640, height=480, fps=25):
+        super().__init__(fps)
+        self.width = width
+        self.height = height
+        self.frame_index = 0
+        self.opened = True
+        self.background = np.full((height, width, 3), 90, dtype=np.uint8)
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        self._wait_for_slot()
+        self.frame_index += 1
+        frame = self.background.copy()
+        x = int((self.frame_index * 7) % self.width)
+        cv2.circle(frame, (x, self.height // 2), 40, (40, 160, 220), -1)
+        cv2.putText(frame, f"SYNTHETIC {self.frame_index}", (20, self.height - 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        return True, stamp_timestamp(frame, time.time())
+
+    def release(self):
+        self.opened = False
+
+
+class LoopingFileCapture(_PacedSource):
+    """Plays a video file in a loop at its native FPS, stamped with capture time"""
+    def __init__(self, path, fps=None, max_width=800):
+        self.cap = cv2.VideoCapture(path)
+        native_fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0
+        super().__init__(fps or native_fps or 25)
+        self.path = path
+        # Pre-shrink to main.py's working width so the stamp isn't rescaled after capture
+        self.max_width = max_width
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        self._wait_for_slot()
+        ok, frame = self.cap.read()
+        if not ok:
+            # End of file: rewind and keep going
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+            if not ok:
+                return False, None
+        h, w = frame.shape[:2]
+        if w > self.max_width:
+            frame = cv2.resize(frame, (self.max_width, int(h * self.max_width / w)))
+        return True, stamp_timestamp(frame, time.time())
+
+    def release(self):
+        self.cap.release()
+
+
+def open_capture(source=None):
+    """
+    Open the camera source:
+        None / "0" / "1" ...  -> webcam index (cv2.VideoCapture)
+        "synthetic"           -> SyntheticCapture
+        anything else         -> video file played in a loop
+    """
+    logger = logging.getLogger("FrameSource")
+    source = "0" if source in (None, "") else str(source)
+    if source.isdigit():
+        return cv2.VideoCapture(int(source))
+    if source == "synthetic":
+        logger.info("Using synthetic frame source")
+        return SyntheticCapture()
+    logger.info(f"Using looping file frame source: {source}")
+    return LoopingFileCapture(source)
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class FrameRingBuffer:
+    """Memory-bounded ring of recent encoded frames (timestamp, jpeg bytes) for one camera"""
+    def __init__(self, max_seconds=20, max_bytes=48 * 1024 * 1024):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.frames = deque()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def push(self, timestamp, jpeg_bytes):
+        with self.lock:
+            self.frames.append((timestamp, jpeg_bytes))
+            self.total_bytes += len(jpeg_bytes)
+
+            # Evict oldest frames by age first, then by memory budget
+            while self.frames and (timestamp - self.frames[0][0] > self.max_seconds
+                                   or self.total_bytes > self.max_bytes):
+                _, old = self.frames.popleft()
+                self.total_bytes -= len(old)
+
+    def window(self, start_ts, end_ts):
+        """Return frames with start_ts <= timestamp <= end_ts (oldest first)"""
+        with self.lock:
+            return [f for f in self.frames if start_ts <= f[0] <= end_ts]
+
+
+class IncidentRecorder:
+    """
+    Keeps a pre-event ring buffer per camera and writes incident clips from a background thread.
+
+    The video loop only appends already-encoded JPEG bytes (push_frame) and reports the
+    decision (on_decision). Collecting the post-trigger frames, building the clip and the
+    metadata JSON all happen on the writer thread.
+    """
+    TRIGGER_DECISIONS = ("LOCK", "WARN")
+
+    def __init__(self, output_dir="incidents", pre_seconds=5, post_seconds=5, max_buffer_bytes=48 * 1024 * 1024):
+        self.logger = logging.getLogger("IncidentRecorder")
+        self.output_dir = output_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_buffer_bytes = max_buffer_bytes
+
+        self.buffers = {}
+        self.last_decisions = {}
+        self.jobs = queue.Queue()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.clips_written = 0
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._writer_loop, name="IncidentWriter", daemon=True)
+        self.thread.start()
+        self.logger.info(f"Incident recorder started (pre={self.pre_seconds}s, post={self.post_seconds}s) -> {self.output_dir}")
+
+    def stop(self, timeout=None):
+        """Stop the writer. Pending incidents are flushed with whatever frames are buffered."""
+        if not self.thread:
+            return
+        self.stop_event.set()
+        self.jobs.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def _buffer(self, camera_id):
+        buf = self.buffers.get(camera_id)
+        if buf is None:
+            # Must hold the full pre + post window until the writer picks the clip up
+            buf = FrameRingBuffer(max_seconds=self.pre_seconds + self.post_seconds + 2,
+                                  max_bytes=self.max_buffer_bytes)
+            self.buffers[camera_id] = buf
+        return buf
+
+    def push_frame(self, camera_id, jpeg_bytes, timestamp=None):
+        """Hot path: O(1) append of the JPEG bytes already produced for streaming"""
+        self._buffer(camera_id).push(timestamp or time.time(), jpeg_bytes)
+
+    def on_decision(self, camera_id, decision, score=0, reasons=None, detections=None, timestamp=None):
+        """Report the current decision; a clip is queued on every transition into LOCK/WARN"""
+        previous = self.last_decisions.get(camera_id)
+        if decision == previous:
+            return False
+        self.last_decisions[camera_id] = decision
+        if decision not in self.TRIGGER_DECISIONS:
+            return False
+
+        trigger_ts = timestamp or time.time()
+        self.jobs.put({
+            "camera_id": camera_id,
+            "decision": decision,
+            "previous_decision": previous,
+            "trigger_time": trigger_ts,
+            "threat_score": score,
+            "reasons": list(reasons or []),
+            "detections": list(detections or []),
+        })
+        self.logger.info(f"Incident queued: {camera_id} {previous} -> {decision} (score {score})")
+        return True
+
+    def _writer_loop(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                # Drain anything still queued before exiting
+                while True:
+                    try:
+                        job = self.jobs.get_nowait()
+                    except queue.Empty:
+                        return
+                    if job is not None:
+                        self._safe_write(job)
+
+            # Wait (without blocking the video loop) until the post-trigger window is buffered
+            ready_at = job["trigger_time"] + self.post_seconds
+            while not self.stop_event.is_set() and time.time() < ready_at:
+                self.stop_event.wait(min(0.25, max(0.0, ready_at - time.time())))
+            self._safe_write(job)
+
+    def _safe_write(self, job):
+        try:
+            self._write_clip(job)
+        except Exception as e:
+            self.logger.error(f"Failed to write incident clip: {e}")
+
+    def _write_clip(self, job):
+        camera_id = job["camera_id"]
+        trigger_ts = job["trigger_time"]
+        buf = self.buffers.get(camera_id)
+        frames = buf.window(trigger_ts - self.pre_seconds, trigger_ts + self.post_seconds) if buf else []
+        if not frames:
+            self.logger.warning(f"No buffered frames for incident on {camera_id}")
+            return None
+
+        stamp = datetime.fromtimestamp(trigger_ts).strftime("%Y%m%d_%H%M%S")
+        base_name = f"{camera_id}_{stamp}_{job['decision']}"
+        clip_path = os.path.join(self.output_dir, base_name + ".mjpeg")
+        meta_path = os.path.join(self.output_dir, base_name + ".json")
+
+        # Concatenated JPEGs = MJPEG stream (plays in VLC/ffplay); no re-encoding needed
+        with open(clip_path, "wb") as f:
+            for _, jpeg in frames:
+                f.write(jpeg)
+
+        duration = frames[-1][0] - frames[0][0]
+        metadata = dict(job)
+        metadata.update({
+            "clip": os.path.basename(clip_path),
+            "frame_count": len(frames),
+            "clip_start": frames[0][0],
+            "clip_end": frames[-1][0],
+            "fps": round(len(frames) / duration, 2) if duration > 0 else 0,
+            "frame_timestamps": [ts for ts, _ in frames],
+        })
+        with open(meta_path, "w") as f:
+            # Detections can contain numpy scalars from the models
+            json.dump(metadata, f, indent=2, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+        self.clips_written += 1
+        self.logger.info(f"Incident clip saved: {clip_path} ({len(frames)} frames)")
+        return clip_path
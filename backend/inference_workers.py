@@ -0,0 +1,388 @@
+import time
+import logging
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future
+from multiprocessing.connection import wait as wait_connections
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from overlay import annotate_frame as draw_overlay
+
+
+class InferenceUnavailable(Exception):
+    """Raised when no worker can take the frame right now (starting up, restarting, failed, or all slots busy)"""
+    pass
+
+
+def _worker_main(worker_id, shm_name, slot_bytes, task_queue, result_conn, model_path, budget_spec=None, zones_file=None):
+    """Entry point of an inference worker process"""
+    from thread_budget import ThreadBudget, pin_process
+    budget = ThreadBudget.from_string(budget_spec) if budget_spec else None
+    if budget:
+        # numpy was already imported with this module; torch/TF pools are created below
+        budget.configure_environment()
+        pin_process(budget.inference_cpus)
+
+    # Heavy imports (torch / TF / ultralytics) only happen inside the worker
+    from detection import ArgusDetector
+    from zones import load_zone_config
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(f"InferenceWorker-{worker_id}")
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    detector = ArgusDetector(model_path=model_path, thread_budget=budget)
+    zone_maps = load_zone_config(zones_file) if zones_file else {}
+    # The parent draws the overlay itself (only when the frame is actually re-encoded)
+    result_conn.send(("ready", worker_id, detector.overlay_classes))
+    logger.info("Worker ready")
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            seq, camera_id, slot, shape = task
+            detector.zones = zone_maps.get(camera_id)
+            # Zero-copy view on the shared slot, returned unannotated
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            try:
+                processed, score, decision, reasons = detector.process_frame(frame, annotate=False)
+                if processed is not frame:
+                    np.copyto(frame, processed)
+                result_conn.send(("result", worker_id, (
+                    seq, score, decision, reasons, detector.last_raw_detections, detector.frame_count,
+                    dict(detector.imgsz_counts)
+                )))
+            except Exception as e:
+                logger.error(f"Inference failed: {e}")
+                result_conn.send(("error", worker_id, (seq, repr(e))))
+            del frame
+    finally:
+        result_conn.close()
+        shm.close()
+
+
+class _WorkerHandle:
+    """Parent-side bookkeeping for one worker process and its shared-memory slots"""
+    def __init__(self, worker_id, slots, slot_bytes):
+        self.worker_id = worker_id
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self.free_slots = list(range(slots))
+        self.process = None
+        self.task_queue = None
+        self.result_reader = None
+        self.ready = False
+        self.ready_since = None
+        self.spawned_at = None
+        self.restarts = 0
+        self.consecutive_failures = 0
+        self.restart_at = None
+        self.failed = False
+        self.last_error = None
+        self.imgsz_counts = {}
+
+    def slot_view(self, slot, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+
+class InferenceWorkerPool:
+    """
+    Runs ArgusDetector in supervised worker processes.
+
+    Frames are copied once into a shared-memory ring slot of the worker that owns the
+    camera (a camera always maps to the same worker, so tracking/skip state stays
+    consistent). Workers process the slot in place and return only the scores over a
+    pipe of their own, so killing one worker cannot corrupt another's results.
+
+    Dead or stalled workers (including ones not ready within startup_timeout) are
+    restarted with exponential backoff and their in-flight frames fail fast. A worker
+    that keeps crashing (bad weights, OOM during model load) is given up on after
+    max_restarts consecutive failures and reported as "failed".
+    """
+    def __init__(self, num_workers=1, model_path='yolov8n.pt', slots_per_worker=4,
+                 max_frame_shape=(1080, 1920, 3), stall_timeout=20.0, thread_budget=None, zones_file=None,
+                 backoff_base=1.0, backoff_max=60.0, max_restarts=5, stable_seconds=60.0, startup_timeout=180.0):
+        self.logger = logging.getLogger("InferencePool")
+        self.num_workers = max(1, num_workers)
+        self.model_path = model_path
+        self.slots_per_worker = slots_per_worker
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.stall_timeout = stall_timeout
+        self.thread_budget = thread_budget
+        self.zones_file = zones_file
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_restarts = max_restarts
+        self.stable_seconds = stable_seconds
+        self.startup_timeout = startup_timeout
+
+        # Spawn everywhere: CUDA/TF runtimes don't survive fork, and it matches Windows
+        self.ctx = mp.get_context("spawn")
+        self.workers = []
+        self.camera_workers = {}
+        self.pending = {}
+        self.next_seq = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.collector = None
+        self.overlay_classes = None
+
+    # --- LIFECYCLE ---
+
+    def start(self):
+        self.stop_event.clear()
+        for worker_id in range(self.num_workers):
+            handle = _WorkerHandle(worker_id, self.slots_per_worker, self.slot_bytes)
+            self.workers.append(handle)
+            self._spawn(handle)
+        self.collector = threading.Thread(target=self._collector_loop, name="InferenceCollector", daemon=True)
+        self.collector.start()
+        self.logger.info(f"Started {self.num_workers} inference worker(s)")
+
+    def _spawn(self, handle):
+        handle.ready = False
+        handle.ready_since = None
+        handle.spawned_at = time.time()
+        handle.restart_at = None
+        # Fresh channels per process: a terminated worker may leave its old ones half-written
+        handle.task_queue = self.ctx.Queue()
+        handle.result_reader, result_writer = self.ctx.Pipe(duplex=False)
+        handle.process = self.ctx.Process(
+            target=_worker_main,
+            args=(handle.worker_id, handle.shm.name, handle.slot_bytes,
+                  handle.task_queue, result_writer, self.model_path,
+                  self.thread_budget.to_string() if self.thread_budget else None, self.zones_file),
+            name=f"ArgusInference-{handle.worker_id}",
+            daemon=True,
+        )
+        handle.process.start()
+        result_writer.close() # Only the worker writes; the reader sees EOF when it exits
+
+    def _close_channels(self, handle):
+        if handle.result_reader is not None:
+            handle.result_reader.close()
+            handle.result_reader = None
+        if handle.task_queue is not None:
+            handle.task_queue.cancel_join_thread()
+            handle.task_queue.close()
+            handle.task_queue = None
+
+    def stop(self, timeout=5.0):
+        self.stop_event.set()
+        for handle in self.workers:
+            if handle.process and handle.process.is_alive():
+                handle.task_queue.put(None)
+        for handle in self.workers:
+            if handle.process:
+                handle.process.join(timeout)
+                if handle.process.is_alive():
+                    handle.process.terminate()
+        if self.collector:
+            self.collector.join(timeout)
+        for handle in self.workers:
+            self._close_channels(handle)
+        with self.lock:
+            for seq in list(self.pending):
+                self._fail(seq, InferenceUnavailable("Inference pool stopped"))
+        for handle in self.workers:
+            handle.shm.close()
+            handle.shm.unlink()
+        self.workers = []
+
+    # --- SUBMISSION ---
+
+    def _worker_for(self, camera_id):
+        worker_id = self.camera_workers.get(camera_id)
+        if worker_id is None:
+            worker_id = len(self.camera_workers) % self.num_workers
+            self.camera_workers[camera_id] = worker_id
+        return self.workers[worker_id]
+
+    def submit(self, camera_id, frame):
+        """Queue a BGR uint8 frame; returns a Future of (frame, score, decision, reasons, detections, frame_count)"""
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame {frame.shape} {frame.dtype} does not fit a {self.slot_bytes} byte slot")
+
+        with self.lock:
+            handle = self._worker_for(camera_id)
+            if handle.failed:
+                raise InferenceUnavailable(f"Worker {handle.worker_id} failed: {handle.last_error}")
+            if not handle.ready:
+                raise InferenceUnavailable(f"Worker {handle.worker_id} not ready")
+            if not handle.free_slots:
+                raise InferenceUnavailable(f"Worker {handle.worker_id} has no free slot")
+            slot = handle.free_slots.pop()
+            seq = self.next_seq
+            self.next_seq += 1
+            future = Future()
+            self.pending[seq] = (handle, slot, frame.shape, future, time.time())
+            task_queue = handle.task_queue
+
+        np.copyto(handle.slot_view(slot, frame.shape), frame)
+        try:
+            task_queue.put((seq, camera_id, slot, frame.shape))
+        except (ValueError, OSError):
+            # Worker was torn down between the check and the put
+            with self.lock:
+                if seq in self.pending:
+                    self._fail(seq, InferenceUnavailable(f"Worker {handle.worker_id} restarting"))
+        return future
+
+    def process_frame(self, camera_id, frame, timeout=10.0):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(camera_id, frame).result(timeout)
+
+    # --- RESULTS + SUPERVISION ---
+
+    def _fail(self, seq, exc):
+        handle, slot, _, future, _ = self.pending.pop(seq)
+        handle.free_slots.append(slot)
+        if not future.done():
+            future.set_exception(exc)
+
+    def _collector_loop(self):
+        while not self.stop_event.is_set():
+            readers = {h.result_reader: h for h in self.workers if h.result_reader is not None}
+            if readers:
+                ready = wait_connections(list(readers), timeout=0.5)
+            else:
+                time.sleep(0.5)
+                ready = []
+
+            for conn in ready:
+                handle = readers[conn]
+                try:
+                    kind, worker_id, payload = conn.recv()
+                except (EOFError, OSError):
+                    # Worker exited; _supervise restarts it
+                    conn.close()
+                    handle.result_reader = None
+                    continue
+                self._handle_message(kind, worker_id, payload)
+
+            self._supervise()
+
+    def _handle_message(self, kind, worker_id, payload):
+        if kind == "ready":
+            handle = self.workers[worker_id]
+            handle.ready = True
+            handle.ready_since = time.time()
+            self.overlay_classes = payload
+        elif kind == "result":
+            seq, score, decision, reasons, detections, frame_count, imgsz_counts = payload
+            self.workers[worker_id].imgsz_counts = imgsz_counts
+            with self.lock:
+                entry = self.pending.pop(seq, None)
+            if entry:
+                handle, slot, shape, future, _ = entry
+                # Copy the annotated frame out so the slot can be reused immediately
+                frame = handle.slot_view(slot, shape).copy()
+                with self.lock:
+                    handle.free_slots.append(slot)
+                future.set_result((frame, score, decision, reasons, detections, frame_count))
+        elif kind == "error":
+            seq, message = payload
+            with self.lock:
+                if seq in self.pending:
+                    self._fail(seq, RuntimeError(message))
+
+    def _supervise(self):
+        now = time.time()
+        for handle in self.workers:
+            if self.stop_event.is_set():
+                return
+            if handle.failed:
+                continue
+            if handle.process is None:
+                # Waiting out the backoff
+                if now >= handle.restart_at:
+                    handle.restarts += 1
+                    self._spawn(handle)
+                continue
+            dead = not handle.process.is_alive()
+            with self.lock:
+                in_flight = [seq for seq, p in self.pending.items() if p[0] is handle]
+                stalled = handle.ready and any(now - self.pending[seq][4] > self.stall_timeout for seq in in_flight)
+            # Hung while loading models (TF/torch init, slow disk): never sends "ready"
+            hung_at_startup = not handle.ready and now - handle.spawned_at > self.startup_timeout
+            if not dead and not stalled and not hung_at_startup:
+                continue
+
+            reason = "died" if dead else "stalled" if stalled else "hung during startup"
+            if not dead:
+                handle.process.terminate()
+            handle.process.join(2.0)
+            exitcode = handle.process.exitcode
+            handle.last_error = f"{reason} (exit code {exitcode})" if dead else reason
+            with self.lock:
+                handle.ready = False
+                for seq in in_flight:
+                    self._fail(seq, InferenceUnavailable(f"Worker {handle.worker_id} {reason}"))
+            self._close_channels(handle)
+            handle.process = None
+
+            # A worker that ran fine for a while starts a fresh failure streak
+            if handle.ready_since and now - handle.ready_since >= self.stable_seconds:
+                handle.consecutive_failures = 0
+            handle.consecutive_failures += 1
+            if handle.consecutive_failures > self.max_restarts:
+                handle.failed = True
+                self.logger.critical(f"Inference worker {handle.worker_id} {handle.last_error}; giving up after "
+                                     f"{self.max_restarts} restarts. Check the model files and available memory.")
+                continue
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (handle.consecutive_failures - 1))
+            handle.restart_at = now + delay
+            self.logger.error(f"Inference worker {handle.worker_id} {handle.last_error}; restarting in {delay:.0f}s")
+
+    def stats(self):
+        with self.lock:
+            return [{
+                "worker": h.worker_id,
+                "pid": h.process.pid if h.process else None,
+                "alive": bool(h.process and h.process.is_alive()),
+                "ready": h.ready,
+                "state": "failed" if h.failed else "ready" if h.ready else
+                         "backoff" if h.process is None else "starting",
+                "restarts": h.restarts,
+                "last_error": h.last_error,
+                "imgsz_counts": h.imgsz_counts,
+                "free_slots": len(h.free_slots),
+            } for h in self.workers]
+
+
+class RemoteDetector:
+    """Stand-in for ArgusDetector in main.py when inference runs in worker processes"""
+    def __init__(self, pool, camera_id):
+        self.pool = pool
+        self.camera_id = camera_id
+        self.frame_count = 0
+        self.last_raw_detections = []
+
+    def submit(self, frame):
+        """Future of (processed_frame, score, decision, reasons), same as ArgusDetector.process_frame"""
+        outer = Future()
+
+        def _done(inner):
+            try:
+                frame_out, score, decision, reasons, detections, frame_count = inner.result()
+            except Exception as e:
+                outer.set_exception(e)
+                return
+            self.frame_count = frame_count
+            self.last_raw_detections = detections
+            outer.set_result((frame_out, score, decision, reasons))
+
+        self.pool.submit(self.camera_id, frame).add_done_callback(_done)
+        return outer
+
+    def process_frame(self, frame, timeout=10.0):
+        return self.submit(frame).result(timeout)
+
+    def annotate_frame(self, frame, raw_detections, threat_score, decision, reasons):
+        """Same overlay as ArgusDetector.annotate_frame, drawn in this process"""
+        return draw_overlay(frame, raw_detections, threat_score, decision, reasons, *self.pool.overlay_classes)
@@ -1,12 +1,26 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Body
+# Thread Budget: set before cv2 / numpy / torch / TF create their thread pools
+from thread_budget import ThreadBudget, pin_process
+thread_budget = ThreadBudget.from_env()
+thread_budget.configure_environment()
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Body, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import cv2
 import asyncio
 import json
 import logging
+import os
 import time
-from detection import ArgusDetector
 from arduino_controller import ArduinoController
+from incident_recorder import IncidentRecorder
+from event_store import EventStore
+from frame_sources import open_capture
+from frame_cache import FrameCache
+from output_gate import StaticSceneGate
+from buffer_pool import FrameBufferPool
+from zones import load_zone_config, zones_file_from_env
+from inference_workers import InferenceWorkerPool, RemoteDetector, InferenceUnavailable
 
 # Initialize Logging
 logging.basicConfig(level=logging.INFO)
@@ -23,13 +37,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+CAMERA_ID = "cam0"
+
+# Camera Source: webcam index (default 0), "synthetic", or a video file path (looped)
+CAMERA_SOURCE = os.environ.get("ARGUS_CAMERA_SOURCE", "0")
+
+# Inference Zones: per-camera polygons (ATM area, entry, ignore), see zones.py for the format
+ZONES_FILE = zones_file_from_env()
+
+# Inference Mode: 0 = in-process (default), N = run ArgusDetector in N supervised worker processes
+INFERENCE_WORKERS = int(os.environ.get("ARGUS_INFERENCE_WORKERS", "0"))
+
+# Spawned workers re-import this script as __mp_main__ when started via `python main.py`.
+# They must not grab the serial port or load a second detector.
+IS_WORKER_CHILD = __name__ == "__mp_main__"
+
 # Initialize Components
-detector = ArgusDetector(model_path='yolov8n.pt') 
+inference_pool = None
+if IS_WORKER_CHILD:
+    detector = None
+elif INFERENCE_WORKERS > 0:
+    inference_pool = InferenceWorkerPool(num_workers=INFERENCE_WORKERS, model_path='yolov8n.pt',
+                                         thread_budget=thread_budget, zones_file=ZONES_FILE)
+    detector = RemoteDetector(inference_pool, CAMERA_ID)
+    # Web/capture process: only resize + encode here, keep it off the inference cores
+    thread_budget.apply_runtimes()
+    pin_process(thread_budget.web_cpus() if thread_budget.inference_cpus else None)
+else:
+    from detection import ArgusDetector
+    detector = ArgusDetector(model_path='yolov8n.pt', thread_budget=thread_budget,
+                             zones=load_zone_config(ZONES_FILE).get(CAMERA_ID))
+    if thread_budget.inference_cpus:
+        logger.warning("inference_cpus pinning only applies with ARGUS_INFERENCE_WORKERS > 0")
 arduino = ArduinoController(port='COM3') 
+recorder = IncidentRecorder(output_dir='incidents', pre_seconds=5, post_seconds=5)
+event_store = EventStore(db_path='argus_events.db')
 
 # Try connecting to Arduino
-arduino_connected = arduino.connect()
-if not arduino_connected:
+arduino_connected = False if IS_WORKER_CHILD else arduino.connect()
+if not arduino_connected and not IS_WORKER_CHILD:
     logger.warning("Arduino not found on COM3. Running in simulation mode.")
 
 # Global State
@@ -44,19 +90,41 @@ system_state = {
 }
 
 global_capture = None
+pipeline_task = None
+
+# Latest encoded frame, shared by every viewer (WebSocket, MJPEG, snapshot)
+frame_cache = FrameCache()
+
+# Skips annotation + JPEG encoding when the scene and overlay are unchanged
+output_gate = StaticSceneGate(diff_threshold=2.0, max_reuse_seconds=2.0)
+
+# Reused capture-side buffers (800px resize) for this camera
+frame_buffers = FrameBufferPool()
 
 @app.on_event("startup")
 async def startup_event():
-    global global_capture
-    global_capture = cv2.VideoCapture(0)
+    global global_capture, pipeline_task
+    global_capture = open_capture(CAMERA_SOURCE)
     if not global_capture.isOpened():
         logger.error("Cannot open webcam")
+    recorder.start()
+    event_store.start()
+    if inference_pool:
+        inference_pool.start()
+    # Single producer: detection + door logic run whether or not anyone is watching
+    pipeline_task = asyncio.create_task(video_pipeline())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     global global_capture
+    if pipeline_task:
+        pipeline_task.cancel()
     if global_capture:
         global_capture.release()
+    recorder.stop(timeout=10)
+    event_store.stop(timeout=10)
+    if inference_pool:
+        inference_pool.stop()
 
 @app.post("/control/siren")
 async def control_siren(action: dict = Body(...)):
@@ -67,6 +135,7 @@ async def control_siren(action: dict = Body(...)):
         system_state["siren_active"] = False
         system_state["snooze_until"] = time.time() + 30 # Snooze for 30 seconds
         logger.info("Siren manually silenced (Snoozed 30s)")
+        event_store.record("control", CAMERA_ID, detail={"siren": "OFF", "snooze_seconds": 30})
         
         # Hardware Silence
         if arduino and system_state["hardware_connected"]:
@@ -75,23 +144,48 @@ async def control_siren(action: dict = Body(...)):
     elif state == "ON":
         system_state["siren_active"] = True
         system_state["snooze_until"] = 0 # Cancel snooze
+        event_store.record("control", CAMERA_ID, detail={"siren": "ON"})
         if arduino and system_state["hardware_connected"]:
             arduino.warning_siren()
 
     return {"status": "success", "siren": system_state["siren_active"]}
 
-@app.websocket("/ws/video")
-async def video_endpoint(websocket: WebSocket):
-    await websocket.accept()
+# --- EVENT HISTORY API ---
+# Plain (sync) handlers so FastAPI runs the SQLite reads in its threadpool, off the event loop
+
+@app.get("/events")
+def get_events(camera: str = None, start: float = None, end: float = None,
+               kind: str = None, limit: int = Query(500, ge=1, le=5000)):
+    return {"events": event_store.timeline(camera, start, end, kind, limit)}
+
+@app.get("/events/aggregate")
+def get_event_aggregates(camera: str = None, start: float = None, end: float = None,
+                         bucket: int = Query(3600, ge=60)):
+    return event_store.aggregates(camera, start, end, bucket)
+
+@app.get("/stats/output")
+def get_output_stats():
+    return {**output_gate.stats(), **frame_cache.stats()}
+
+@app.get("/inference/workers")
+def get_inference_workers():
+    if not inference_pool:
+        return {"mode": "in-process", "workers": [], "thread_budget": thread_budget.as_dict(),
+                "imgsz_counts": detector.imgsz_counts}
+    return {"mode": "workers", "workers": inference_pool.stats(), "thread_budget": thread_budget.as_dict()}
+
+async def video_pipeline():
+    """Capture -> detect -> act -> encode loop; publishes each frame to frame_cache"""
     global system_state
     
-    try:
-        while True:
+    while True:
+        try:
             if not global_capture or not global_capture.isOpened():
                 await asyncio.sleep(1)
                 continue
                 
-            success, frame = global_capture.read()
+            # Blocking camera read + inference run in worker threads so viewers stay responsive
+            success, frame = await asyncio.to_thread(global_capture.read)
             if not success:
                 logger.warning("Failed to read frame")
                 await asyncio.sleep(0.1)
@@ -101,15 +195,27 @@ async def video_endpoint(websocket: WebSocket):
             height, width = frame.shape[:2]
             if width > 800:
                 scale = 800 / width
-                frame = cv2.resize(frame, (800, int(height * scale)))
+                frame = frame_buffers.resize(frame, (800, int(height * scale)))
 
             # Process Frame
-            processed_frame, score, decision, reasons = detector.process_frame(frame)
+            if inference_pool:
+                # Out-of-process: await the worker without blocking the event loop (frames come back unannotated)
+                try:
+                    processed_frame, score, decision, reasons = await asyncio.wrap_future(detector.submit(frame))
+                except InferenceUnavailable as e:
+                    logger.debug(f"Frame dropped: {e}")
+                    await asyncio.sleep(0.1)
+                    continue
+            else:
+                # Annotation deferred until we know the frame actually needs encoding
+                processed_frame, score, decision, reasons = await asyncio.to_thread(detector.process_frame, frame, False)
 
             # Check Arduino Feedback (THROTTLED: Only every 30 frames / ~1 sec)
             if arduino_connected and (detector.frame_count % 30 == 0): 
                 hw_status = arduino.read_status()
                 system_state["hardware_connected"] = True
+                if hw_status:
+                    event_store.record("serial", CAMERA_ID, detail={"line": hw_status})
                 if hw_status == "STATUS_LOCKED":
                     system_state["lock_status"] = "LOCKED"
                 elif hw_status == "STATUS_UNLOCKED":
@@ -156,12 +262,89 @@ async def video_endpoint(websocket: WebSocket):
                     if arduino_connected:
                         arduino.unlock_door()
 
-            # Send Frame (Compressed)
-            # Send Frame (Quality 70 - Good balance)
-            _, buffer = cv2.imencode('.jpg', processed_frame, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
-            await websocket.send_bytes(buffer.tobytes())
+            # Static Scene Short-Circuit: same content + same overlay -> reuse the previous JPEG
+            overlay_key = output_gate.overlay_key(score, decision, reasons, detector.last_raw_detections)
+            frame_bytes = output_gate.check(processed_frame, overlay_key)
+            unchanged = frame_bytes is not None
+            if not unchanged:
+                detector.annotate_frame(processed_frame, detector.last_raw_detections, score, decision, reasons)
+                # Encode Frame once (Quality 70 - Good balance), every viewer reuses these bytes
+                _, buffer = cv2.imencode('.jpg', processed_frame, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
+                frame_bytes = buffer.tobytes()
+                output_gate.commit(frame_bytes)
+
+            # Incident recording: reuse the streamed JPEG bytes, clip writing happens off-loop
+            recorder.push_frame(CAMERA_ID, frame_bytes, system_state["last_update"])
+            event_store.record_decision(CAMERA_ID, decision, score, reasons, system_state["last_update"])
+            recorder.on_decision(CAMERA_ID, decision, score, reasons, detector.last_raw_detections,
+                                 system_state["last_update"])
+
+            if unchanged:
+                # Same image: keep the ETag (snapshot pollers get 304) and don't resend to streams
+                frame_cache.mark_unchanged()
+            else:
+                await frame_cache.publish(frame_bytes, system_state["last_update"])
             await asyncio.sleep(0.04) # 25 FPS Cap to prevent CPU starvation
 
+        except asyncio.CancelledError:
+            logger.info("Video pipeline stopped")
+            raise
+        except Exception as e:
+            # Keep the single producer alive: door logic must not stop on one bad frame
+            logger.error(f"Video Pipeline Error: {e}")
+            await asyncio.sleep(1)
+
+def frame_headers():
+    return {
+        "ETag": frame_cache.etag,
+        "Age": str(int(frame_cache.age)),
+        "X-Frame-Timestamp": f"{frame_cache.timestamp:.3f}",
+        "Cache-Control": "no-cache",
+    }
+
+@app.get("/snapshot.jpg")
+async def snapshot(request: Request):
+    """Latest annotated frame; supports If-None-Match so polling viewers get cheap 304s"""
+    if frame_cache.jpeg is None:
+        return Response(status_code=503, headers={"Retry-After": "1"})
+    headers = frame_headers()
+    if request.headers.get("if-none-match") == frame_cache.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=frame_cache.jpeg, media_type="image/jpeg", headers=headers)
+
+@app.get("/stream.mjpg")
+async def mjpeg_stream(fps: float = Query(25, gt=0, le=30)):
+    """multipart/x-mixed-replace stream for NVRs, wall displays and browsers"""
+    async def frames():
+        seq = 0
+        min_interval = 1.0 / fps
+        with frame_cache.watching():
+            while True:
+                try:
+                    seq, jpeg = await frame_cache.wait_for_next(seq, timeout=5)
+                except asyncio.TimeoutError:
+                    continue
+                yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                       + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+                await asyncio.sleep(min_interval)
+
+    return StreamingResponse(frames(), media_type="multipart/x-mixed-replace; boundary=frame",
+                             headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/ws/video")
+async def video_endpoint(websocket: WebSocket):
+    await websocket.accept()
+    seq = 0
+    
+    try:
+        with frame_cache.watching():
+            while True:
+                try:
+                    seq, jpeg = await frame_cache.wait_for_next(seq, timeout=5)
+                except asyncio.TimeoutError:
+                    continue
+                await websocket.send_bytes(jpeg)
+
     except WebSocketDisconnect:
         logger.info("Video Client disconnected")
     except Exception as e:
@@ -180,7 +363,8 @@ async def status_endpoint(websocket: WebSocket):
                 "lock_status": system_state["lock_status"],
                 "siren": system_state["siren_active"],
                 "hardware": system_state["hardware_connected"],
-                "reasons": system_state["reasons"]
+                "reasons": system_state["reasons"],
+                "last_update": system_state["last_update"]
             })
             await asyncio.sleep(0.5)
     except WebSocketDisconnect:
@@ -0,0 +1,70 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class StaticSceneGate:
+    """
+    Decides whether a frame needs re-annotation + JPEG encoding at all.
+
+    Compares a small grayscale thumbnail against the last *encoded* frame (so slow drift
+    still triggers a refresh) together with the overlay state (decision, score, reasons,
+    boxes). If both are effectively unchanged, the previous JPEG bytes can be reused.
+    A refresh is forced every max_reuse_seconds so viewers never see a frozen image for long.
+    """
+    def __init__(self, thumb_size=(64, 48), diff_threshold=2.0, max_reuse_seconds=2.0):
+        self.thumb_size = thumb_size
+        self.diff_threshold = diff_threshold
+        self.max_reuse_seconds = max_reuse_seconds
+
+        self.reference_thumb = None
+        self.reference_key = None
+        self.reference_time = 0.0
+        self.last_jpeg = None
+        self._pending = None
+
+        self.encoded = 0
+        self.reused = 0
+
+    @staticmethod
+    def overlay_key(score, decision, reasons, detections):
+        boxes = tuple(
+            (str(d['cls']), tuple(int(v) for v in d['bbox']), round(float(d['conf']), 2))
+            for d in detections
+        )
+        return (decision, score, tuple(reasons), boxes)
+
+    def _thumbnail(self, frame):
+        small = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def check(self, frame, key, now=None):
+        """Return cached JPEG bytes if the frame can be skipped, else None (caller must encode + commit)"""
+        now = now or time.time()
+        thumb = self._thumbnail(frame)
+        self._pending = (thumb, key, now)
+
+        if (self.last_jpeg is None or key != self.reference_key
+                or now - self.reference_time > self.max_reuse_seconds):
+            return None
+        diff = cv2.absdiff(thumb, self.reference_thumb)
+        if float(np.mean(diff)) > self.diff_threshold:
+            return None
+
+        self.reused += 1
+        return self.last_jpeg
+
+    def commit(self, jpeg_bytes):
+        """Record the freshly encoded frame as the new reference"""
+        self.reference_thumb, self.reference_key, self.reference_time = self._pending
+        self.last_jpeg = jpeg_bytes
+        self.encoded += 1
+
+    def stats(self):
+        total = self.encoded + self.reused
+        return {
+            "encoded": self.encoded,
+            "reused": self.reused,
+            "encodes_saved_ratio": round(self.reused / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,68 @@
+import cv2
+
+
+def annotate_frame(frame, raw_detections, threat_score, decision, reasons,
+                   class_names, object_classes, weapon_classes):
+    """
+    Draw detection boxes + status overlay in place.
+
+    Kept free of model imports so the web process can annotate frames coming back from
+    inference workers; class_names is the COCO model's {id: name} map.
+    """
+    for d in raw_detections:
+        x1, y1, x2, y2 = map(int, d['bbox'])
+        cls = d['cls']
+        conf = d['conf']
+        source = d['source']
+
+        # Filter Visualization: Only draw Threats or Persons
+        should_draw = False
+        color = (0, 255, 0) # Default Green
+        label_text = ""
+
+        if source == 'coco':
+            # Only draw Person, Weapons, Bags
+            if cls in object_classes:
+                should_draw = True
+                label_text = f"{class_names[cls]} {conf:.2f}"
+            elif cls in weapon_classes:
+                should_draw = True
+                label_text = f"{class_names[cls]} {conf:.2f}"
+                color = (0, 0, 255) # Red for weapon
+
+        elif source in ['helmet_model', 'mask_model', 'gun_model', 'cap_model']:
+            should_draw = True # Always draw custom model detections
+            if source == 'helmet_model':
+                label_text = f"HELMET {conf:.2f}"
+                if cls == 'HELMET_REAL': color = (0, 0, 255)
+            elif source == 'mask_model':
+                label_text = f"MASK {conf:.2f}"
+                color = (0, 0, 255)
+            elif source == 'gun_model':
+                label_text = f"GUN {conf:.2f}"
+                color = (0, 0, 255)
+            elif source == 'cap_model':
+                label_text = f"CAP {conf:.2f}"
+                color = (0, 165, 255)
+
+        if should_draw:
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(frame, label_text, (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+
+    # Overlay Status
+    status_color = (0, 255, 0)
+    if decision == "WARN":
+        status_color = (0, 255, 255) # Yellow
+    if decision == "LOCK":
+        status_color = (0, 0, 255) # Red
+
+    cv2.putText(frame, f"STATUS: {decision} ({threat_score}%)", (20, 40),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, status_color, 2)
+
+    y_offset = 80
+    for reason in reasons:
+        cv2.putText(frame, f"- {reason}", (20, y_offset),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+        y_offset += 25
+
+    return frame
@@ -0,0 +1,52 @@
+from event_store import EventStore
+
+
+def make_store(tmp_path):
+    store = EventStore(db_path=str(tmp_path / "events.db"), batch_size=10, flush_interval=0.05)
+    store.start()
+    return store
+
+
+def test_record_decision_only_on_transitions(tmp_path):
+    store = make_store(tmp_path)
+    sequence = ["NORMAL", "NORMAL", "WARN", "WARN", "LOCK", "NORMAL", "NORMAL"]
+    recorded = [store.record_decision("cam0", d, 10, [], timestamp=1000.0 + i) for i, d in enumerate(sequence)]
+    store.stop()
+
+    assert recorded == [True, False, True, False, True, True, False]
+    events = store.timeline(camera_id="cam0", kind="decision")
+    # Newest first, each linked to the decision it replaced
+    assert [(e["decision"], e["previous_decision"]) for e in events] == [
+        ("NORMAL", "LOCK"), ("LOCK", "WARN"), ("WARN", "NORMAL"), ("NORMAL", None)]
+
+
+def test_timeline_filters(tmp_path):
+    store = make_store(tmp_path)
+    store.record("serial", "cam0", detail={"cmd": "LOCK"}, timestamp=1000.0)
+    store.record_decision("cam0", "WARN", 45, ["Multiple People (2)"], timestamp=1010.0)
+    store.record_decision("cam1", "LOCK", 90, ["Weapon(s): gun"], timestamp=1020.0)
+    store.stop()
+
+    assert [e["camera_id"] for e in store.timeline()] == ["cam1", "cam0", "cam0"]
+    assert [e["kind"] for e in store.timeline(camera_id="cam0")] == ["decision", "serial"]
+    window = store.timeline(start=1005.0, end=1015.0)
+    assert len(window) == 1 and window[0]["reasons"] == ["Multiple People (2)"]
+    assert store.timeline(kind="serial")[0]["detail"] == {"cmd": "LOCK"}
+
+
+def test_aggregates_bucket_by_time_and_camera(tmp_path):
+    store = make_store(tmp_path)
+    # Bucket [3600, 7200): cam0 WARN -> LOCK -> NORMAL; bucket [7200, 10800): cam0 WARN, cam1 LOCK
+    for ts, camera, decision, score in [(3700, "cam0", "WARN", 45), (3800, "cam0", "LOCK", 80),
+                                        (3900, "cam0", "NORMAL", 10), (7300, "cam0", "WARN", 50),
+                                        (7400, "cam1", "LOCK", 95)]:
+        store.record_decision(camera, decision, score, [], timestamp=float(ts))
+    store.stop()
+
+    result = store.aggregates(start=3600, end=10800, bucket_seconds=3600)
+    buckets = {(b["bucket_start"], b["camera_id"]): b for b in result["buckets"]}
+    assert set(buckets) == {(3600, "cam0"), (7200, "cam0"), (7200, "cam1")}
+    assert buckets[(3600, "cam0")]["counts"] == {"WARN": 1, "LOCK": 1, "NORMAL": 1}
+    assert buckets[(3600, "cam0")]["max_score"] == 80
+    assert buckets[(7200, "cam1")]["counts"] == {"LOCK": 1}
+    assert store.aggregates(camera_id="cam1", start=3600, end=10800)["buckets"][0]["max_score"] == 95
@@ -0,0 +1,68 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("websockets")
+
+from fleet_aggregator import FleetSubscriber, FleetState, parse_filter_message
+
+
+def record(site, status):
+    return {"site": site, "status": status}
+
+
+def test_offer_queues_matching_updates_coalesced_per_site():
+    subscriber = FleetSubscriber(decisions=["WARN", "LOCK"])
+    subscriber.offer(record("atm-01", "WARN"))
+    subscriber.offer(record("atm-01", "LOCK"))
+    subscriber.offer(record("atm-02", "NORMAL"))
+    assert subscriber.wakeup.is_set()
+
+    updates, removed = subscriber.take()
+    assert updates == [record("atm-01", "LOCK")]
+    assert removed == []
+    assert not subscriber.wakeup.is_set()
+
+
+def test_site_leaving_the_filter_is_reported_removed_once():
+    subscriber = FleetSubscriber(decisions=["WARN", "LOCK"])
+    subscriber.offer(record("atm-01", "LOCK"))
+    subscriber.take()
+
+    subscriber.offer(record("atm-01", "NORMAL"))
+    assert subscriber.take() == ([], ["atm-01"])
+    # Already removed: further non-matching updates are ignored
+    subscriber.offer(record("atm-01", "NORMAL"))
+    assert not subscriber.wakeup.is_set()
+    assert subscriber.take() == ([], [])
+
+
+def test_site_returning_before_take_cancels_removal():
+    subscriber = FleetSubscriber(decisions=["LOCK"])
+    subscriber.offer(record("atm-01", "LOCK"))
+    subscriber.take()
+    subscriber.offer(record("atm-01", "NORMAL"))
+    subscriber.offer(record("atm-01", "LOCK"))
+    assert subscriber.take() == ([record("atm-01", "LOCK")], [])
+
+
+def test_state_indexes_by_decision_and_pushes_changes():
+    state = FleetState()
+    state.register("atm-01", "ws://a/ws/status")
+    state.register("atm-02", "ws://b/ws/status")
+    subscriber = FleetSubscriber(sites=["atm-02"])
+    state.subscribers.add(subscriber)
+
+    state.update("atm-02", status="LOCK", connected=True)
+    state.update("atm-01", status="WARN", connected=True)
+    assert [r["site"] for r in state.query(decisions=["LOCK", "WARN"])] == ["atm-01", "atm-02"]
+    assert state.summary()["by_decision"] == {"LOCK": 1, "WARN": 1}
+    updates, _ = subscriber.take()
+    assert [u["site"] for u in updates] == ["atm-02"]
+
+
+def test_parse_filter_message_rejects_malformed_input():
+    assert parse_filter_message('{"filter": {"decision": ["LOCK"], "site": "a, b"}}') == ({"LOCK"}, {"a", "b"})
+    assert parse_filter_message('{"ping": 1}') is None
+    for bad in ("not json", "[1]", '{"filter": 3}', '{"filter": {"decision": [1]}}'):
+        with pytest.raises(ValueError):
+            parse_filter_message(bad)
@@ -0,0 +1,26 @@
+from incident_recorder import FrameRingBuffer
+
+
+def test_evicts_frames_older_than_max_seconds():
+    ring = FrameRingBuffer(max_seconds=2, max_bytes=1_000_000)
+    for i in range(10):
+        ring.push(100.0 + i * 0.5, b"x" * 10)
+    # Newest at 104.5: everything from 102.5 on is kept
+    assert [ts for ts, _ in ring.frames] == [102.5, 103.0, 103.5, 104.0, 104.5]
+    assert ring.total_bytes == 50
+
+
+def test_evicts_oldest_frames_over_byte_budget():
+    ring = FrameRingBuffer(max_seconds=60, max_bytes=250)
+    for i in range(5):
+        ring.push(100.0 + i, b"x" * 100)
+    assert [ts for ts, _ in ring.frames] == [103.0, 104.0]
+    assert ring.total_bytes == 200
+
+
+def test_window_is_inclusive_and_ordered():
+    ring = FrameRingBuffer(max_seconds=60)
+    for i in range(6):
+        ring.push(100.0 + i, bytes([i]))
+    assert [ts for ts, _ in ring.window(101.0, 103.0)] == [101.0, 102.0, 103.0]
+    assert ring.window(200.0, 210.0) == []
@@ -0,0 +1,63 @@
+from threat_scoring import ThreatScoringEngine
+
+CATEGORIES = ("TAMPER", "WEAPON", "FACE_MASK", "HELMET", "CROWD", "VIOLENCE", "OBJECT", "TIME")
+T0 = 1_000_000.0
+
+
+def make_engine(t0=T0):
+    # Same settings as ArgusDetector
+    engine = ThreatScoringEngine(window_seconds=2.0, lock_enter=70, lock_exit=50, warn_enter=40, warn_exit=30,
+                                 enter_dwell=0.6, exit_dwell=1.5, min_hold=3.0, categories=CATEGORIES)
+    engine.reset(t0)
+    return engine
+
+
+def run(engine, cadence, present, duration=10.0, frame_interval=0.04, t0=T0):
+    """
+    Inference every `cadence` seconds (present(i) -> contributions of the i-th inference),
+    decide() on every frame like the detector. Returns {decision: first time seen}.
+    """
+    first_seen = {}
+    next_inference, index = 0.0, 0
+    t = 0.0
+    while t < duration:
+        if t >= next_inference - 1e-9:
+            engine.update(present(index), t0 + t)
+            next_inference += cadence
+            index += 1
+        first_seen.setdefault(engine.decide(t0 + t)[1], t)
+        t = round(t + frame_interval, 6)
+    return first_seen
+
+
+def test_single_spike_never_locks():
+    for cadence in (0.2, 0.3, 0.5, 0.7, 1.0, 1.5):
+        for spike_index in (0, 4):  # right after startup and in steady state
+            engine = make_engine()
+            seen = run(engine, cadence, lambda i: {"WEAPON": 100} if i == spike_index else {})
+            assert "LOCK" not in seen, (cadence, spike_index)
+            assert "WARN" not in seen, (cadence, spike_index)
+
+
+def test_constant_weapon_locks_quickly():
+    for cadence in (0.2, 0.7, 1.0):
+        seen = run(make_engine(), cadence, lambda i: {"WEAPON": 100})
+        assert seen.get("LOCK", 99) <= 1.0 + cadence, (cadence, seen)
+
+
+def test_intermittent_weapon_still_locks():
+    # Detected on 2 of every 3 inference frames for as long as it is in view
+    seen = run(make_engine(), 0.2, lambda i: {"WEAPON": 100} if i % 3 != 2 else {})
+    assert "LOCK" in seen
+
+
+def test_mostly_present_crowd_warns():
+    # Two people in 9 of 10 frames
+    seen = run(make_engine(), 0.2, lambda i: {"CROWD": 40} if i % 10 != 9 else {})
+    assert "WARN" in seen
+
+
+def test_zero_based_timestamps_are_not_wall_clock():
+    # Offset-based timelines (forensic mode, tests) may start at 0.0
+    seen = run(make_engine(t0=0.0), 0.2, lambda i: {"WEAPON": 100}, t0=0.0)
+    assert seen.get("LOCK", 99) <= 1.2
@@ -0,0 +1,180 @@
+import os
+import sys
+import logging
+
+# NOTE: keep this module free of numpy/torch/cv2 imports at load time, it has to run
+# before those libraries create their thread pools.
+
+logger = logging.getLogger("ThreadBudget")
+
+# Env vars read once by the native thread pools when their library is first imported
+POOL_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def _env_int(var):
+    try:
+        return int(os.environ[var])
+    except (KeyError, ValueError):
+        return None
+
+
+def parse_cpus(spec):
+    """'2-3' / '1+3' / '0-1+3' -> [..] ('+' joins ranges since ',' separates budget fields)"""
+    cpus = []
+    for chunk in str(spec).replace(" ", "").split("+"):
+        if not chunk:
+            continue
+        if "-" in chunk:
+            lo, hi = chunk.split("-")
+            cpus.extend(range(int(lo), int(hi) + 1))
+        else:
+            cpus.append(int(chunk))
+    return sorted(set(cpus))
+
+
+class ThreadBudget:
+    """
+    One place to size the CPU thread pools of torch (ultralytics), TensorFlow (mask model),
+    OpenCV (face SSD, resize/encode) and ONNX Runtime, plus optional CPU pinning of the
+    inference workers away from the web/capture process.
+
+    Configured via ARGUS_THREAD_BUDGET, e.g.
+        ARGUS_THREAD_BUDGET="torch_intra=2,tf_intra=1,opencv=1,inference_cpus=1-3"
+    Unset fields respect thread env vars the operator already exported (OMP_NUM_THREADS,
+    TF_NUM_INTRAOP_THREADS, ...); otherwise the (cores - reserved_cores) available cores are
+    split between the runtimes (about half to torch/ONNX, the rest to TF and OpenCV) instead
+    of every pool getting all of them. Inter-op pools default to 1 thread.
+    """
+    INT_FIELDS = ("torch_intra", "torch_inter", "tf_intra", "tf_inter", "opencv", "onnx_intra", "onnx_inter", "reserved_cores")
+
+    def __init__(self, torch_intra=None, torch_inter=None, tf_intra=None, tf_inter=None, opencv=None,
+                 onnx_intra=None, onnx_inter=None, inference_cpus=None, reserved_cores=1):
+        # Fields set explicitly override the environment; the rest only fill in gaps
+        self.explicit = {k for k, v in (("torch_intra", torch_intra), ("torch_inter", torch_inter),
+                                        ("tf_intra", tf_intra), ("tf_inter", tf_inter)) if v}
+        cores = os.cpu_count() or 1
+        available = max(1, cores - reserved_cores)
+        torch_share = max(1, (available + 1) // 2)
+        tf_share = max(1, (available - torch_share + 1) // 2)
+        opencv_share = max(1, available - torch_share - tf_share)
+
+        self.reserved_cores = reserved_cores
+        self.torch_intra = torch_intra or _env_int("OMP_NUM_THREADS") or torch_share
+        self.torch_inter = torch_inter or 1
+        self.tf_intra = tf_intra or _env_int("TF_NUM_INTRAOP_THREADS") or tf_share
+        self.tf_inter = tf_inter or _env_int("TF_NUM_INTEROP_THREADS") or 1
+        self.opencv = opencv or opencv_share
+        self.onnx_intra = onnx_intra or self.torch_intra # ONNX stands in for the torch model
+        self.onnx_inter = onnx_inter or 1
+        self.inference_cpus = inference_cpus or []
+
+    @classmethod
+    def from_string(cls, spec):
+        kwargs = {}
+        for item in (spec or "").split(","):
+            if not item.strip():
+                continue
+            key, _, value = item.partition("=")
+            key = key.strip()
+            if key == "inference_cpus":
+                kwargs[key] = parse_cpus(value)
+            elif key in cls.INT_FIELDS:
+                kwargs[key] = int(value)
+            else:
+                raise ValueError(f"Unknown thread budget field '{key}'")
+        return cls(**kwargs)
+
+    @classmethod
+    def from_env(cls, var="ARGUS_THREAD_BUDGET"):
+        return cls.from_string(os.environ.get(var, ""))
+
+    def to_string(self):
+        parts = [f"{k}={getattr(self, k)}" for k in self.INT_FIELDS]
+        if self.inference_cpus:
+            parts.append("inference_cpus=" + "+".join(str(c) for c in self.inference_cpus))
+        return ",".join(parts)
+
+    def as_dict(self):
+        data = {k: getattr(self, k) for k in self.INT_FIELDS}
+        data["inference_cpus"] = list(self.inference_cpus)
+        return data
+
+    # --- APPLY ---
+
+    def configure_environment(self):
+        """Call before importing numpy / torch / TF / onnxruntime. Operator-set env vars win over defaults."""
+        def put(var, value, field):
+            if field in self.explicit:
+                os.environ[var] = str(value)
+            else:
+                os.environ.setdefault(var, str(value))
+
+        for var in POOL_ENV_VARS:
+            put(var, self.torch_intra, "torch_intra")
+        # Idle OpenMP threads sleep instead of spinning on cores other runtimes need
+        os.environ.setdefault("OMP_WAIT_POLICY", "PASSIVE")
+        put("TF_NUM_INTRAOP_THREADS", self.tf_intra, "tf_intra")
+        put("TF_NUM_INTEROP_THREADS", self.tf_inter, "tf_inter")
+
+    def apply_runtimes(self):
+        """Size the pools of every runtime already imported (safe to call more than once)"""
+        applied = {}
+        try:
+            import cv2
+            cv2.setNumThreads(self.opencv)
+            applied["opencv"] = self.opencv
+        except ImportError:
+            pass
+
+        if "torch" in sys.modules:
+            import torch
+            torch.set_num_threads(self.torch_intra)
+            try:
+                torch.set_num_interop_threads(self.torch_inter)
+            except RuntimeError:
+                pass # Only settable before the first inter-op parallel work
+            applied["torch"] = (torch.get_num_threads(), torch.get_num_interop_threads())
+
+        if "tensorflow" in sys.modules:
+            import tensorflow as tf
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(self.tf_intra)
+                tf.config.threading.set_inter_op_parallelism_threads(self.tf_inter)
+                applied["tensorflow"] = (self.tf_intra, self.tf_inter)
+            except RuntimeError as e:
+                # TF context already initialized; TF_NUM_*_THREADS env vars cover this case
+                logger.warning(f"TensorFlow threads not changed: {e}")
+
+        logger.info(f"Thread budget applied: {applied}")
+        return applied
+
+    def onnx_session_options(self):
+        """SessionOptions for any onnxruntime.InferenceSession created by the detector"""
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.onnx_intra
+        options.inter_op_num_threads = self.onnx_inter
+        return options
+
+    def web_cpus(self):
+        """CPUs left for the web/capture process when inference is pinned"""
+        cores = list(range(os.cpu_count() or 1))
+        rest = [c for c in cores if c not in self.inference_cpus]
+        return rest or cores
+
+
+def pin_process(cpus, pid=0):
+    """Restrict a process to the given CPUs (Linux: sched_setaffinity, elsewhere: psutil if installed)"""
+    if not cpus:
+        return False
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, cpus)
+        else:
+            import psutil
+            psutil.Process(pid or os.getpid()).cpu_affinity(list(cpus))
+        logger.info(f"Pinned process {pid or os.getpid()} to CPUs {list(cpus)}")
+        return True
+    except Exception as e:
+        logger.warning(f"CPU pinning unavailable: {e}")
+        return False
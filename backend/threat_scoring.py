@@ -0,0 +1,132 @@
+import time
+from collections import deque
+
+
+class SlidingWindow:
+    """Time-based sliding window with O(1) amortized push/evict, a hit count and a monotonic max"""
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.samples = deque()
+        self.max_queue = deque()
+        self.hits = 0
+
+    def push(self, timestamp, value):
+        self.samples.append((timestamp, value))
+        if value > 0:
+            self.hits += 1
+        while self.max_queue and self.max_queue[-1][1] <= value:
+            self.max_queue.pop()
+        self.max_queue.append((timestamp, value))
+
+    def evict(self, now):
+        cutoff = now - self.seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            _, value = self.samples.popleft()
+            if value > 0:
+                self.hits -= 1
+        while self.max_queue and self.max_queue[0][0] < cutoff:
+            self.max_queue.popleft()
+
+    @property
+    def count(self):
+        return len(self.samples)
+
+    @property
+    def max(self):
+        return self.max_queue[0][1] if self.max_queue else 0.0
+
+
+class ThreatScoringEngine:
+    """
+    Per-camera temporal scoring: each threat category keeps a sliding window of its
+    per-inference contribution. A category is active once it persists, i.e. it was
+    present in at least min_hits inferences and in at least presence_ratio of the
+    inferences in the window. An active category adds its full weight (the window max),
+    so an intermittent but ongoing detection (a weapon seen in 2 of 3 frames) scores
+    like a constant one, while a single noisy frame adds nothing.
+
+    Decisions use separate enter/exit thresholds (hysteresis), a minimum dwell before
+    any transition and a minimum hold time before stepping down.
+    """
+    LEVELS = {"NORMAL": 0, "WARN": 1, "LOCK": 2}
+
+    def __init__(self, window_seconds=2.0, lock_enter=70, lock_exit=50, warn_enter=40, warn_exit=30,
+                 enter_dwell=0.6, exit_dwell=1.5, min_hold=3.0, categories=(), min_hits=2, presence_ratio=0.5):
+        self.window_seconds = window_seconds
+        self.lock_enter = lock_enter
+        self.lock_exit = lock_exit
+        self.warn_enter = warn_enter
+        self.warn_exit = warn_exit
+        self.enter_dwell = enter_dwell
+        self.exit_dwell = exit_dwell
+        self.min_hold = min_hold
+        self.categories = tuple(categories)
+        self.min_hits = min_hits
+        self.presence_ratio = presence_ratio
+
+        self.windows = {}
+        self.state = "NORMAL"
+        self.state_since = time.time()
+        self.candidate = None
+        self.candidate_since = 0.0
+        self.reset()
+
+    def update(self, contributions, timestamp=None):
+        """Feed one inference result: {category: score contribution}. Absent categories count as 0."""
+        if timestamp is None:
+            timestamp = time.time()
+        for category in contributions:
+            if category not in self.windows:
+                self.windows[category] = SlidingWindow(self.window_seconds)
+        for category, window in self.windows.items():
+            window.push(timestamp, contributions.get(category, 0))
+
+    def _is_active(self, window):
+        return window.hits >= self.min_hits and window.hits >= self.presence_ratio * window.count
+
+    def score(self, now=None):
+        if now is None:
+            now = time.time()
+        total = 0.0
+        for window in self.windows.values():
+            window.evict(now)
+            if self._is_active(window):
+                total += window.max
+        return int(round(min(total, 100)))
+
+    def _target(self, score):
+        if score >= self.lock_enter or (self.state == "LOCK" and score >= self.lock_exit):
+            return "LOCK"
+        if score >= self.warn_enter or (self.state != "NORMAL" and score >= self.warn_exit):
+            return "WARN"
+        return "NORMAL"
+
+    def decide(self, now=None):
+        """Return (smoothed_score, decision). Cheap enough to call on every (also skipped) frame."""
+        if now is None:
+            now = time.time()
+        score = self.score(now)
+        target = self._target(score)
+
+        if target == self.state:
+            self.candidate = None
+            return score, self.state
+
+        if target != self.candidate:
+            self.candidate = target
+            self.candidate_since = now
+
+        escalating = self.LEVELS[target] > self.LEVELS[self.state]
+        dwell = self.enter_dwell if escalating else self.exit_dwell
+        held_long_enough = escalating or (now - self.state_since) >= self.min_hold
+        if now - self.candidate_since >= dwell and held_long_enough:
+            self.state = target
+            self.state_since = now
+            self.candidate = None
+        return score, self.state
+
+    def reset(self, now=None):
+        self.windows = {category: SlidingWindow(self.window_seconds) for category in self.categories}
+        self.state = "NORMAL"
+        self.state_since = time.time() if now is None else now
+        self.candidate = None
@@ -0,0 +1,157 @@
+import os
+import json
+import logging
+
+import cv2
+import numpy as np
+
+ZONE_TYPES = ("atm", "entry", "ignore")
+ACTIVE_TYPES = ("atm", "entry")
+
+# Next to this module, so it resolves the same whether started from the repo root or backend/
+DEFAULT_ZONES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zones.json")
+
+
+def zones_file_from_env(var="ARGUS_ZONES_FILE"):
+    """Zone config path: $ARGUS_ZONES_FILE (warns if it points nowhere) or DEFAULT_ZONES_FILE"""
+    path = os.environ.get(var)
+    if not path:
+        return DEFAULT_ZONES_FILE
+    if not os.path.exists(path):
+        logging.getLogger("ZoneMap").warning(f"{var}={path} does not exist (cwd {os.getcwd()}); "
+                                             f"inference runs on the full frame")
+    return path
+
+
+class ZoneMap:
+    """
+    Polygon zones for one camera (ATM area, entry, ignore).
+
+    Masks are rasterized once per frame size: a label map (pixel -> zone index) for O(1)
+    membership lookups, and the bounding crop of the active zones. Inference runs on
+    that crop with ignore regions blacked out, and detections are mapped back and
+    filtered by zone.
+    """
+    def __init__(self, zones):
+        self.logger = logging.getLogger("ZoneMap")
+        for zone in zones:
+            if zone.get("type") not in ZONE_TYPES:
+                raise ValueError(f"Zone '{zone.get('name')}' has unknown type '{zone.get('type')}' (expected {ZONE_TYPES})")
+        self.zones = zones
+        self.shape = None
+        self.label_map = None
+        self.crop_box = None
+        self.crop_mask = None
+        self.crop_mask_bgr = None
+        self.has_ignore = any(z["type"] == "ignore" for z in zones)
+        self.has_active = any(z["type"] in ACTIVE_TYPES for z in zones)
+
+    def _polygon(self, zone, w, h):
+        points = np.array(zone["points"], dtype=np.float32)
+        if zone.get("normalized", True):
+            points = points * np.array([w, h], dtype=np.float32)
+        return np.round(points).astype(np.int32)
+
+    def _build(self, h, w):
+        # Label 0 = outside every active zone; active zones are 1..N; ignore is painted last and wins
+        self.label_map = np.zeros((h, w), dtype=np.uint8)
+        for index, zone in enumerate(self.zones, start=1):
+            if zone["type"] in ACTIVE_TYPES:
+                cv2.fillPoly(self.label_map, [self._polygon(zone, w, h)], index)
+        if not self.has_active:
+            self.label_map[:] = 255 # Only ignore zones: everything else counts as active
+        for zone in self.zones:
+            if zone["type"] == "ignore":
+                cv2.fillPoly(self.label_map, [self._polygon(zone, w, h)], 0)
+
+        active = self.label_map > 0
+        ys, xs = np.where(active)
+        if len(xs) == 0:
+            self.logger.warning("Zones leave no active area; using the full frame")
+            self.crop_box = (0, 0, w, h)
+            self.crop_mask = None
+            self.crop_mask_bgr = None
+        else:
+            x1, y1, x2, y2 = int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1
+            self.crop_box = (x1, y1, x2, y2)
+            crop_active = active[y1:y2, x1:x2]
+            # Only mask when the crop actually contains excluded pixels
+            self.crop_mask = None if crop_active.all() else crop_active.astype(np.uint8) * 255
+            # 3-channel 0/255 mask: AND-ing with it writes every dst pixel, while mask= would
+            # leave excluded pixels of a reused buffer stale
+            self.crop_mask_bgr = None if self.crop_mask is None else cv2.merge([self.crop_mask] * 3)
+        self.shape = (h, w)
+
+    def _ensure(self, frame):
+        h, w = frame.shape[:2]
+        if self.shape != (h, w):
+            self._build(h, w)
+
+    def crop(self, image):
+        """View of the active-zone bounding box (no masking, no copy)"""
+        self._ensure(image)
+        x1, y1, x2, y2 = self.crop_box
+        return image[y1:y2, x1:x2]
+
+    def prepare(self, frame, pool=None):
+        """
+        Return (inference_image, (offset_x, offset_y)): the zone crop with excluded pixels zeroed.
+        With a FrameBufferPool the masked crop is written into a reused buffer (valid until the next frame).
+        """
+        self._ensure(frame)
+        x1, y1, x2, y2 = self.crop_box
+        view = frame[y1:y2, x1:x2]
+        if self.crop_mask is None:
+            return view, (x1, y1)
+        # Separate array: the displayed frame must keep its pixels
+        if pool is None:
+            return cv2.bitwise_and(view, view, mask=self.crop_mask), (x1, y1)
+        masked = pool.get("zone_masked", view.shape, view.dtype)
+        cv2.bitwise_and(view, self.crop_mask_bgr, dst=masked)
+        return masked, (x1, y1)
+
+    def zone_at(self, x, y):
+        """Zone dict at pixel (x, y) or None if outside active zones / inside an ignore zone"""
+        h, w = self.shape
+        xi, yi = min(max(int(x), 0), w - 1), min(max(int(y), 0), h - 1)
+        label = self.label_map[yi, xi]
+        if label == 0:
+            return None
+        if label == 255:
+            return {"name": "frame", "type": "atm"}
+        return self.zones[label - 1]
+
+    def map_and_filter(self, detections, offset, anchor_bottom_classes=()):
+        """Shift crop-space boxes to frame space and drop those outside the active zones"""
+        ox, oy = offset
+        kept = []
+        for d in detections:
+            x1, y1, x2, y2 = d['bbox']
+            d['bbox'] = [x1 + ox, y1 + oy, x2 + ox, y2 + oy]
+            # People are "in" a zone where they stand (bottom-center), objects by their center
+            ax = (d['bbox'][0] + d['bbox'][2]) / 2
+            ay = d['bbox'][3] if d['cls'] in anchor_bottom_classes else (d['bbox'][1] + d['bbox'][3]) / 2
+            zone = self.zone_at(ax, ay)
+            if zone is None:
+                continue
+            d['zone'] = zone["name"]
+            kept.append(d)
+        return kept
+
+
+def load_zone_config(path):
+    """
+    Load {camera_id: ZoneMap} from a JSON file:
+        {"cam0": [{"name": "atm", "type": "atm", "points": [[0.3, 0.2], [0.7, 0.2], [0.7, 1.0], [0.3, 1.0]]},
+                  {"name": "window", "type": "ignore", "points": [[0.0, 0.0], [0.25, 0.0], [0.25, 0.6], [0.0, 0.6]]}]}
+    Points are normalized (0-1) unless the zone sets "normalized": false.
+    """
+    logger = logging.getLogger("ZoneMap")
+    if not path or not os.path.exists(path):
+        logger.info(f"No zone config at {path}; inference runs on the full frame")
+        return {}
+    with open(path) as f:
+        config = json.load(f)
+    zone_maps = {camera_id: ZoneMap(zones) for camera_id, zones in config.items() if zones}
+    logger.info(f"Loaded zones for cameras: {list(zone_maps)}")
+    return zone_maps
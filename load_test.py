@@ -0,0 +1,222 @@
+"""
+ARGUS server load test.
+
+Starts the backend against a synthetic (or looping file) camera, then ramps up N
+concurrent /ws/video + /ws/status clients while hitting /control/siren, and reports
+per-client FPS, end-to-end frame latency, status delay and server CPU/memory.
+
+    python load_test.py --clients 1 2 4 8 --duration 20
+    python load_test.py --source path/to/lobby.mp4 --siren-rate 5
+    python load_test.py --url http://localhost:8000 --server-pid 1234   # existing server
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+
+import cv2
+import numpy as np
+import websockets
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from frame_sources import read_timestamp
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    print("WARNING: psutil not installed. Server CPU/memory will not be reported.")
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+async def video_client(ws_url, duration, stats):
+    frames, latencies = 0, []
+    deadline = time.time() + duration
+    try:
+        async with websockets.connect(f"{ws_url}/ws/video", max_size=None) as ws:
+            while time.time() < deadline:
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=max(0.1, deadline - time.time()))
+                except asyncio.TimeoutError:
+                    break
+                received = time.time()
+                frames += 1
+                # Decoding every frame would skew the client; sample every 5th
+                if frames % 5 == 0:
+                    frame = cv2.imdecode(np.frombuffer(message, np.uint8), cv2.IMREAD_COLOR)
+                    captured = read_timestamp(frame, received) if frame is not None else None
+                    if captured:
+                        latencies.append((received - captured) * 1000)
+    except Exception as e:
+        stats["errors"].append(f"video: {e}")
+    stats["video"].append({"fps": frames / duration, "latencies": latencies})
+
+
+async def status_client(ws_url, duration, stats):
+    delays = []
+    deadline = time.time() + duration
+    try:
+        async with websockets.connect(f"{ws_url}/ws/status") as ws:
+            while time.time() < deadline:
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=max(0.1, deadline - time.time()))
+                except asyncio.TimeoutError:
+                    break
+                data = json.loads(message)
+                if data.get("last_update"):
+                    delays.append((time.time() - data["last_update"]) * 1000)
+    except Exception as e:
+        stats["errors"].append(f"status: {e}")
+    stats["status"].append(delays)
+
+
+def post_siren(http_url, state):
+    request = urllib.request.Request(
+        f"{http_url}/control/siren",
+        data=json.dumps({"state": state}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=5) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+
+async def siren_client(http_url, duration, rate, stats):
+    if rate <= 0:
+        return
+    deadline = time.time() + duration
+    state = "ON"
+    while time.time() < deadline:
+        try:
+            stats["siren"].append(await asyncio.to_thread(post_siren, http_url, state))
+        except Exception as e:
+            stats["errors"].append(f"siren: {e}")
+        state = "OFF" if state == "ON" else "ON"
+        await asyncio.sleep(1.0 / rate)
+
+
+async def sample_server(process, duration, stats):
+    if not process:
+        return
+    process.cpu_percent(None)
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        await asyncio.sleep(1.0)
+        try:
+            procs = [process] + process.children(recursive=True)
+            stats["cpu"].append(sum(p.cpu_percent(None) for p in procs))
+            stats["rss"].append(sum(p.memory_info().rss for p in procs) / (1024 * 1024))
+        except psutil.Error:
+            break
+
+
+async def run_step(args, clients, server_process):
+    stats = {"video": [], "status": [], "siren": [], "cpu": [], "rss": [], "errors": []}
+    ws_url = args.url.replace("http", "ws", 1)
+    tasks = []
+    for _ in range(clients):
+        tasks.append(video_client(ws_url, args.duration, stats))
+        tasks.append(status_client(ws_url, args.duration, stats))
+    tasks.append(siren_client(args.url, args.duration, args.siren_rate, stats))
+    tasks.append(sample_server(server_process, args.duration, stats))
+    await asyncio.gather(*tasks)
+
+    fps = [v["fps"] for v in stats["video"]]
+    latencies = [l for v in stats["video"] for l in v["latencies"]]
+    delays = [d for s in stats["status"] for d in s]
+    return {
+        "clients": clients,
+        "fps_mean": float(np.mean(fps)) if fps else 0.0,
+        "fps_min": float(np.min(fps)) if fps else 0.0,
+        "latency_p50_ms": percentile(latencies, 50),
+        "latency_p95_ms": percentile(latencies, 95),
+        "status_delay_p50_ms": percentile(delays, 50),
+        "status_delay_p95_ms": percentile(delays, 95),
+        "siren_p50_ms": percentile(stats["siren"], 50),
+        "cpu_percent": float(np.mean(stats["cpu"])) if stats["cpu"] else float("nan"),
+        "rss_mb": float(np.max(stats["rss"])) if stats["rss"] else float("nan"),
+        "errors": len(stats["errors"]),
+    }
+
+
+def start_server(args):
+    env = dict(os.environ, ARGUS_CAMERA_SOURCE=args.source)
+    port = args.url.rsplit(":", 1)[-1].strip("/")
+    # Run from the repo root: the detector loads its models via backend/... paths
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", "backend", "--port", port, "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(args.startup_timeout):
+        try:
+            urllib.request.urlopen(f"{args.url}/docs", timeout=1).read()
+            return process
+        except Exception:
+            if process.poll() is not None:
+                raise SystemExit("[-] Server exited during startup")
+            time.sleep(1)
+    process.terminate()
+    raise SystemExit("[-] Server did not come up in time")
+
+
+def print_report(results):
+    header = f"{'clients':>7} {'fps avg':>8} {'fps min':>8} {'lat p50':>8} {'lat p95':>8} {'stat p50':>9} {'stat p95':>9} {'siren':>7} {'cpu %':>6} {'rss MB':>7} {'err':>4}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['clients']:>7} {r['fps_mean']:>8.1f} {r['fps_min']:>8.1f} {r['latency_p50_ms']:>8.0f} {r['latency_p95_ms']:>8.0f} "
+              f"{r['status_delay_p50_ms']:>9.0f} {r['status_delay_p95_ms']:>9.0f} {r['siren_p50_ms']:>7.0f} "
+              f"{r['cpu_percent']:>6.0f} {r['rss_mb']:>7.0f} {r['errors']:>4}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="ARGUS backend load test")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--source", default="synthetic", help="'synthetic' or a video file (used when starting the server)")
+    parser.add_argument("--clients", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per step")
+    parser.add_argument("--siren-rate", type=float, default=1.0, help="/control/siren requests per second")
+    parser.add_argument("--server-pid", type=int, help="Measure an already running server instead of starting one")
+    parser.add_argument("--startup-timeout", type=int, default=120)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    print("--- ARGUS Load Test ---")
+    server = None
+    if args.server_pid:
+        pid = args.server_pid
+    else:
+        print(f"Starting backend with ARGUS_CAMERA_SOURCE={args.source} ...")
+        server = start_server(args)
+        pid = server.pid
+    server_process = psutil.Process(pid) if PSUTIL_AVAILABLE else None
+
+    results = []
+    try:
+        for clients in args.clients:
+            print(f"[+] {clients} video + {clients} status client(s) for {args.duration:.0f}s")
+            results.append(await run_step(args, clients, server_process))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(10)
+
+    print()
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())